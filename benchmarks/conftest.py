@@ -0,0 +1,28 @@
+import pytest
+
+from cache import SingleFlight
+from tests.conftest import circuit_breaker, fmp_calls, load_fixture  # noqa: F401
+
+# Batch size for the multi-ticker throughput benchmarks
+BATCH_TICKERS = [f"T{i:03d}" for i in range(50)]
+
+
+@pytest.fixture
+def fresh_pipeline(fmp_calls, monkeypatch):  # noqa: F811
+    """Replays recorded FMP responses and returns a function that empties the caches"""
+    import data_validation
+    import utils
+
+    def reset():
+        utils.get_response_cache().clear()
+        monkeypatch.setattr(utils, "inflight_requests", SingleFlight())
+        monkeypatch.setattr(data_validation, "inflight_validations", SingleFlight())
+        monkeypatch.setattr(data_validation, "inflight_sections", SingleFlight())
+
+    return reset
+
+
+def scaled_records(metric: str, rows: int) -> list[dict]:
+    """Repeats a recorded history until it has the given number of rows"""
+    recorded = load_fixture(metric)
+    return [recorded[i % len(recorded)] for i in range(rows)]
@@ -0,0 +1,104 @@
+import asyncio
+
+import plotly.io as pio
+import polars as pl
+import pytest
+
+from benchmarks.conftest import BATCH_TICKERS, scaled_records
+from charts import create_growth_bar_chart, create_metrics_bar_chart
+from config import settings
+from data_validation import get_validated_stock_data, validate_section
+from stock_models import Growth, KeyMetrics, frame_from_records
+from tests.conftest import load_fixture
+from transforms import growth_history, metrics_history
+from utils import FMPClient, run_sync
+
+
+def test_single_ticker_fetch_and_validate(benchmark, fresh_pipeline):
+    """Cold fetch and validation of every section for one ticker"""
+    data = benchmark.pedantic(
+        get_validated_stock_data, args=("AAPL",), setup=fresh_pipeline, rounds=30
+    )
+    assert data["quote"] is not None
+
+
+def test_batch_fetch_throughput(benchmark, fresh_pipeline):
+    """Cold fetch of every endpoint for a batch of tickers"""
+
+    async def fetch_all():
+        return [item async for item in FMPClient().fetch_many(BATCH_TICKERS)]
+
+    results = benchmark.pedantic(
+        lambda: run_sync(fetch_all()), setup=fresh_pipeline, rounds=5
+    )
+    benchmark.extra_info["tickers"] = len(BATCH_TICKERS)
+    assert len(results) == len(BATCH_TICKERS)
+
+
+# Columnar validation breaks even with row validation at about 50-100 rows, which
+# sets the columnar_min_rows default; recorded annual histories hold 10 rows
+@pytest.mark.parametrize("rows", [20, 100, 1_000])
+@pytest.mark.parametrize("columnar", [True, False], ids=["columnar", "rows"])
+@pytest.mark.parametrize("section", ["key_metrics", "growth"])
+def test_validation_per_row(benchmark, monkeypatch, section, columnar, rows):
+    """Validation of an annual history, in columnar and row mode"""
+    metric = "key-metrics" if section == "key_metrics" else "financial-growth"
+    records = scaled_records(metric, rows)
+    monkeypatch.setattr(settings, "columnar_validation", columnar)
+    monkeypatch.setattr(settings, "columnar_min_rows", 0)
+
+    validated = benchmark(validate_section, section, records)
+    benchmark.extra_info["rows"] = len(records)
+    assert len(validated) == len(records)
+
+
+def multi_ticker_frame(model, metric: str, tickers: int) -> pl.DataFrame:
+    """Stacks one recorded history per ticker into a long frame"""
+    history = frame_from_records(model, load_fixture(metric))
+    return pl.concat(
+        history.with_columns(symbol=pl.lit(f"T{i:03d}")) for i in range(tickers)
+    )
+
+
+def test_growth_transform(benchmark):
+    """Lazy growth transform over a 500-ticker frame"""
+    df = multi_ticker_frame(Growth, "financial-growth", 500)
+    result = benchmark(lambda: growth_history(df.lazy()).collect())
+    assert result.height == df.height
+
+
+def test_metrics_transform(benchmark):
+    """Eager metrics transform for a single ticker, as on a page view"""
+    df = multi_ticker_frame(KeyMetrics, "key-metrics", 1)
+    result = benchmark(metrics_history, df)
+    assert result.height == df.height
+
+
+def test_metrics_figure_build(benchmark):
+    """Building and serializing one valuation metric chart"""
+    df = metrics_history(multi_ticker_frame(KeyMetrics, "key-metrics", 1))
+
+    def build():
+        fig = create_metrics_bar_chart(df, "FYDateEnding", "pe_ratio", "PE Ratio", 37.3)
+        return pio.to_json(fig, validate=False)
+
+    assert benchmark(build)
+
+
+def test_growth_figure_build(benchmark):
+    """Building and serializing one growth chart"""
+    df = growth_history(multi_ticker_frame(Growth, "financial-growth", 1))
+
+    def build():
+        fig = create_growth_bar_chart(df, "Year", "rev_growth", "Rev Growth")
+        return pio.to_json(fig, validate=False)
+
+    assert benchmark(build)
+
+
+def test_fetch_data_cached(benchmark, fmp_calls):
+    """Warm fetch of every endpoint for one ticker, served from the response cache"""
+    client = FMPClient()
+    run_sync(client.fetch_data("AAPL"))
+    data = benchmark(lambda: asyncio.run(client.fetch_data("AAPL")))
+    assert data is not None
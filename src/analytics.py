@@ -0,0 +1,169 @@
+# analytics.py
+
+from collections.abc import Iterable
+from pathlib import Path
+
+import polars as pl
+from pydantic import BaseModel
+
+import data_validation
+from config import get_settings
+from metrics import timed
+from stock_models import (
+    CompanyProfile,
+    Growth,
+    KeyMetrics,
+    KeyMetricsTTM,
+    frame_from_records,
+)
+from store import SnapshotStore, write_parquet_atomic
+from utils import stock_logger
+
+# Stored sections read for the analytics, with the models typing their columns
+UNIVERSE_SECTIONS: dict[str, type[BaseModel]] = {
+    "profile": CompanyProfile,
+    "key_metrics_ttm": KeyMetricsTTM,
+    "key_metrics": KeyMetrics,
+    "growth": Growth,
+}
+
+# Annual valuation metrics and their TTM counterparts
+TTM_PAIRS: dict[str, str] = {
+    "pe_ratio": "pe_ratio_ttm",
+    "ev_over_ebitda": "ev_over_ebitda_ttm",
+    "ev_to_fcf": "ev_to_fcf_ttm",
+    "fcf_yield": "fcf_yield_ttm",
+}
+
+# Per-share series compounded over the CAGR window
+CAGR_COLUMNS: tuple[str, ...] = ("rev_per_share", "fcf_per_share")
+
+
+def cagr(column: str, years: int, over: str = "symbol") -> pl.Expr:
+    """Compound annual growth over the previous years rows of each ticker; null
+    unless both ends are positive. Rows must be annual and sorted by date."""
+    start = pl.col(column).shift(years).over(over)
+    end = pl.col(column)
+    return (
+        pl.when((start > 0) & (end > 0))
+        .then((end / start) ** (1 / years) - 1)
+        .alias(f"{column}_cagr_{years}y")
+    )
+
+
+def with_cagr[Frame: (pl.DataFrame, pl.LazyFrame)](
+    history: Frame, columns: Iterable[str], years: int
+) -> Frame:
+    """Adds rolling CAGR series to annual histories of many tickers"""
+    return history.sort("symbol", "date").with_columns(
+        cagr(column, years) for column in columns
+    )
+
+
+def ttm_zscores[Frame: (pl.DataFrame, pl.LazyFrame)](
+    ttm: Frame, history: Frame, pairs: dict[str, str]
+) -> Frame:
+    """Scores each TTM value against the same metric's annual history of its own
+    ticker, in standard deviations; null without two distinct annual values"""
+    stats = history.group_by("symbol").agg(
+        *(pl.col(annual).mean().alias(f"{annual}_mean") for annual in pairs),
+        *(pl.col(annual).std().alias(f"{annual}_std") for annual in pairs),
+    )
+    scores = [
+        pl.when(pl.col(f"{annual}_std") > 0)
+        .then((pl.col(ttm_column) - pl.col(f"{annual}_mean")) / pl.col(f"{annual}_std"))
+        .alias(f"{ttm_column}_z")
+        for annual, ttm_column in pairs.items()
+    ]
+    return (
+        ttm.join(stats, on="symbol", how="left")
+        .with_columns(scores)
+        .drop(pl.col("^.*_(mean|std)$"))
+    )
+
+
+def sector_percentiles[Frame: (pl.DataFrame, pl.LazyFrame)](
+    frame: Frame, columns: Iterable[str], by: str = "sector"
+) -> Frame:
+    """Ranks columns within each sector as percentiles from 0 to 100; nulls stay
+    null and are left out of the ranking"""
+    return frame.with_columns(
+        (
+            pl.col(column).rank("average").over(by)
+            / pl.col(column).count().over(by)
+            * 100
+        )
+        .round(1)
+        .alias(f"{column}_pct")
+        for column in columns
+    )
+
+
+def load_universe(store: SnapshotStore | None = None) -> dict[str, pl.DataFrame]:
+    """Reads the latest stored sections of every ticker into one frame per section;
+    stored records were validated when fetched, so they are only typed here"""
+    store = store or data_validation.get_snapshot_store()
+    frames = {}
+    for section, model in UNIVERSE_SECTIONS.items():
+        stored = store.load_universe(section)
+        symbols = [ticker for ticker, records in stored.items() for _ in records]
+        records = [record for records in stored.values() for record in records]
+        frames[section] = frame_from_records(model, records).with_columns(
+            pl.Series("symbol", symbols, dtype=pl.String)
+        )
+    return frames
+
+
+def compute_analytics(
+    sections: dict[str, pl.DataFrame], years: int | None = None
+) -> pl.DataFrame:
+    """Derives CAGRs, TTM z-scores and sector percentiles for every ticker at once,
+    one row per ticker"""
+    years = years or get_settings().analytics_cagr_years
+    history = with_cagr(sections["key_metrics"].lazy(), CAGR_COLUMNS, years)
+    latest_cagr = history.group_by("symbol").agg(
+        pl.col(f"{column}_cagr_{years}y").last() for column in CAGR_COLUMNS
+    )
+    latest_growth = (
+        sections["growth"]
+        .lazy()
+        .sort("symbol", "date")
+        .group_by("symbol")
+        .agg(pl.col("^fiveY_.*$").last())
+    )
+    sectors = sections["profile"].lazy().select("symbol", "sector").unique("symbol")
+    ttm = sections["key_metrics_ttm"].lazy().unique("symbol", keep="last")
+
+    ranked = [*TTM_PAIRS.values(), *(f"{c}_cagr_{years}y" for c in CAGR_COLUMNS)]
+    with timed("analytics"):
+        return (
+            ttm_zscores(ttm, history, TTM_PAIRS)
+            .join(sectors, on="symbol", how="left")
+            .join(latest_cagr, on="symbol", how="left")
+            .join(latest_growth, on="symbol", how="left")
+            .pipe(sector_percentiles, ranked)
+            .select("symbol", "sector", pl.exclude("symbol", "sector"))
+            .sort("symbol")
+            .collect()
+        )
+
+
+def write_analytics(df: pl.DataFrame, path: str | None = None) -> Path:
+    """Writes the analytics to Parquet, replacing the previous file atomically"""
+    return write_parquet_atomic(df, Path(path or get_settings().analytics_path))
+
+
+def run_analytics(store: SnapshotStore | None = None) -> Path | None:
+    """Computes the analytics over every stored ticker and writes them"""
+    sections = load_universe(store)
+    if sections["key_metrics_ttm"].is_empty():
+        stock_logger().warning("No stored tickers to analyze")
+        return None
+    df = compute_analytics(sections)
+    path = write_analytics(df)
+    stock_logger().info(f"Analytics computed for {df.height} tickers")
+    return path
+
+
+if __name__ == "__main__":
+    run_analytics()
@@ -1,28 +1,105 @@
-from typing import Any
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
 
-import plotly.graph_objects as go
-import polars as pl
 import streamlit as st
 import streamlit.components.v1 as components
 
-from data_validation import get_validated_stock_data
+from config import get_settings
+from metrics import start_metrics_server, timed
+
+# Data and charting libraries are imported on first use, so the landing page
+# renders without loading polars, plotly, httpx or the validation models
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+    import polars as pl
+
+    from data_validation import SectionData
+    from stock_models import CompanyProfileRecord, KeyMetricsTTMRecord, QuoteRecord
+
+# Settings bounding the Streamlit caches of validated data and frames, and of figures
+UI_CACHE = "ui_cache_max_entries"
+FIGURE_CACHE = "ui_figure_cache_max_entries"
+
+
+def ui_cache(max_entries: str, shared: bool = False) -> Callable[[Callable], Callable]:
+    """Caches a function with st.cache_data, reading its TTL and size limit from
+    the settings on first call rather than when the app is imported. Shared
+    values are kept with st.cache_resource and handed out as is, uncopied, so
+    callers must not modify them."""
+
+    def decorate(func: Callable) -> Callable:
+        cached: Callable | None = None
 
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            nonlocal cached
+            if cached is None:
+                settings = get_settings()
+                cache = st.cache_resource if shared else st.cache_data
+                cached = cache(
+                    ttl=settings.ui_cache_ttl,
+                    max_entries=getattr(settings, max_entries),
+                    show_spinner=False,
+                )(func)
+            return cached(*args, **kwargs)
+
+        def clear() -> None:
+            if cached is not None:
+                cached.clear()
+
+        wrapper.clear = clear
+        return wrapper
+
+    return decorate
+
+
+@ui_cache(UI_CACHE)
+def load_section(ticker: str, section: str) -> tuple[SectionData | None, str]:
+    """Fetches one validated section and its version, once per ticker and TTL"""
+    import polars as pl
+
+    from data_validation import (
+        DataValidationError,
+        get_validated_section,
+        section_records,
+    )
+    from utils import stock_logger
 
-def display_profile(profile_data: dict[str, Any]) -> None:
+    try:
+        records = get_validated_section(ticker, section)
+    except DataValidationError as e:
+        # Show a section that never validates as missing, like a failed fetch
+        stock_logger().warning(f"Skipped {section} for {ticker}: {e}")
+        records = None
+    if isinstance(records, pl.DataFrame):
+        payload = records.write_json().encode()
+    else:
+        payload = json.dumps(
+            section_records(records or []), sort_keys=True, default=str
+        ).encode()
+    return records, hashlib.sha1(payload).hexdigest()[:12]
+
+
+def display_profile(profile_data: CompanyProfileRecord) -> None:
     """Displays company profile in sidebar"""
     try:
         if profile_data:
             st.sidebar.write("## Company Profile")
-            st.sidebar.image(profile_data["image"], width=180)
-            st.sidebar.write(f"## {profile_data['company_name']}")
-            st.sidebar.write(f"**Sector**: {profile_data['sector']}")
-            st.sidebar.write(f"**Industry**: {profile_data['industry']}")
-            st.sidebar.write(f"**Description**: {profile_data['description']}")
+            st.sidebar.image(profile_data.image, width=180)
+            st.sidebar.write(f"## {profile_data.company_name}")
+            st.sidebar.write(f"**Sector**: {profile_data.sector}")
+            st.sidebar.write(f"**Industry**: {profile_data.industry}")
+            st.sidebar.write(f"**Description**: {profile_data.description}")
     except IndexError:
         st.write("Couldn't find company profile.")
 
 
-def display_quotes(quote_data: dict[str, Any], profile_data: dict[str, Any]) -> None:
+def display_quotes(quote_data: QuoteRecord, profile_data: CompanyProfileRecord) -> None:
     """Displays company quotes in main area"""
 
     def display_stock_metric(header, value) -> None:
@@ -58,15 +135,15 @@ def display_quotes(quote_data: dict[str, Any], profile_data: dict[str, Any]) ->
         st.html(html_content)
 
     try:
-        stock_price = f"${quote_data['price']:,.2f}"
-        change_price = f"{quote_data['change_percent']:,.2f}%"
-        year_low = f"${quote_data['year_low']:,.2f}"
-        year_high = f"${quote_data['year_high']:,.2f}"
-        market_cap = f"{quote_data['market_cap']/1_000_000_000:.2f}B"
-        vol_avg = f"{quote_data['vol_avg']/1_000_000:.2f}M"
-        earning_date = quote_data["earning_date"][:10]
-        eps = f"{quote_data['eps']:.2f}"
-        shares_outstanding = f"{quote_data["shares_outstanding"]/1_000_000_000:.2f}B"
+        stock_price = f"${quote_data.price:,.2f}"
+        change_price = f"{quote_data.change_percent:,.2f}%"
+        year_low = f"${quote_data.year_low:,.2f}"
+        year_high = f"${quote_data.year_high:,.2f}"
+        market_cap = f"{quote_data.market_cap / 1_000_000_000:.2f}B"
+        vol_avg = f"{quote_data.vol_avg / 1_000_000:.2f}M"
+        earning_date = quote_data.earning_date[:10]
+        eps = f"{quote_data.eps:.2f}"
+        shares_outstanding = f"{quote_data.shares_outstanding / 1_000_000_000:.2f}B"
 
         # Set page top quotes layout
         col1, col2, col3, col4, col5, col6, col7, col8, col9 = st.columns(9)
@@ -93,7 +170,7 @@ def display_quotes(quote_data: dict[str, Any], profile_data: dict[str, Any]) ->
         print(e)
 
 
-def display_metric_tables(data: list[dict[str, Any]]):
+def display_metric_tables(data: list[Any]):
     """Displays metric tables in main area"""
 
     def generate_table_rows(data: dict[str, Any]):  # table_name: str
@@ -147,23 +224,27 @@ def display_metric_tables(data: list[dict[str, Any]]):
             """
         return components.html(table_html, height=185)  # 210
 
-    # Get data and generate tables
+    from data_validation import section_frame
+
+    # Get data and generate tables; growth is a frame or rows, per validation mode
     quote_data, key_metrics_ttm_data, growth_data, ratings_data = data
-    latest_growth_data = growth_data[0]
+    latest_growth_data = (
+        section_frame(growth_data).sort("date", descending=True).row(0, named=True)
+    )
     latest_ratings_data = ratings_data[0]
 
     valuation_data = {
-        "PE Ratio (TTM)": f"{quote_data['pe']:,.2f}",
-        "EV/EBITDA (TTM)": f"{key_metrics_ttm_data['ev_over_ebitda_ttm']:,.2f}",
-        "Price/Sales (TTM)": f"{key_metrics_ttm_data['pts_ratio_ttm']:,.2f}",
-        "Price/Book (TTM)": f"{key_metrics_ttm_data['ptb_ratio_ttm']:,.2f}",
+        "PE Ratio (TTM)": f"{quote_data.pe:,.2f}",
+        "EV/EBITDA (TTM)": f"{key_metrics_ttm_data.ev_over_ebitda_ttm:,.2f}",
+        "Price/Sales (TTM)": f"{key_metrics_ttm_data.pts_ratio_ttm:,.2f}",
+        "Price/Book (TTM)": f"{key_metrics_ttm_data.ptb_ratio_ttm:,.2f}",
     }
 
     freecashflow_data = {
-        "FCF Yield (TTM)": f"{key_metrics_ttm_data['fcf_yield_ttm'] * 100:,.2f}%",
-        "Price/FCF (TTM)": f"{key_metrics_ttm_data['pfcf_ratio_ttm']:,.2f}",
-        "EV/FCF (TTM)": f"{key_metrics_ttm_data['ev_to_fcf_ttm']:,.2f}",
-        "FCF/Share (TTM)": f"{key_metrics_ttm_data['fcf_per_share_ttm']:,.2f}",
+        "FCF Yield (TTM)": f"{key_metrics_ttm_data.fcf_yield_ttm * 100:,.2f}%",
+        "Price/FCF (TTM)": f"{key_metrics_ttm_data.pfcf_ratio_ttm:,.2f}",
+        "EV/FCF (TTM)": f"{key_metrics_ttm_data.ev_to_fcf_ttm:,.2f}",
+        "FCF/Share (TTM)": f"{key_metrics_ttm_data.fcf_per_share_ttm:,.2f}",
     }
 
     growth_metric_data = {
@@ -174,16 +255,16 @@ def display_metric_tables(data: list[dict[str, Any]]):
     }
 
     dividend_data = {
-        "Div Yield (TTM)": f"{key_metrics_ttm_data['dvd_yield_pct_ttm']:,.2f}%",
-        "Div/Share (TTM)": f"{key_metrics_ttm_data['dvd_per_share_ttm']:,.2f}",
-        "Payout Ratio (TTM)": f"{key_metrics_ttm_data['payout_ratio_ttm'] * 100:,.2f}%",
+        "Div Yield (TTM)": f"{key_metrics_ttm_data.dvd_yield_pct_ttm:,.2f}%",
+        "Div/Share (TTM)": f"{key_metrics_ttm_data.dvd_per_share_ttm:,.2f}",
+        "Payout Ratio (TTM)": f"{key_metrics_ttm_data.payout_ratio_ttm * 100:,.2f}%",
     }
 
     rating_data = {
-        "Date": f"{latest_ratings_data['date']}",
-        "Rating": f"{latest_ratings_data['rating']}",
-        "Score": f"{latest_ratings_data['score']}",
-        "Recommendation": f"{latest_ratings_data['recommendation']}",
+        "Date": f"{latest_ratings_data.date}",
+        "Rating": f"{latest_ratings_data.rating}",
+        "Score": f"{latest_ratings_data.score}",
+        "Recommendation": f"{latest_ratings_data.recommendation}",
     }
 
     # Define tables layout
@@ -218,148 +299,47 @@ def display_metric_tables(data: list[dict[str, Any]]):
         container.empty()
 
 
-def display_metrics_charts(
-    metrics_data: list[dict[str, Any]], key_metrics_ttm_data: dict[str, Any]
-):
-    """Displays metrics charts in main area"""
+@ui_cache(UI_CACHE)
+def build_metrics_frame(
+    ticker: str, version: str, _metrics_data: SectionData
+) -> pl.DataFrame:
+    """Builds the valuation metrics frame once per ticker and data version"""
+    import polars as pl
 
-    def create_compact_bar_chart(data: pl.DataFrame, x_col, y_col, title, ttm_value):
-        fig = go.Figure()
-
-        # Historical data bars
-        fig.add_trace(
-            go.Bar(
-                x=data[x_col],
-                y=data[y_col],
-                name="Historical",
-                marker=dict(
-                    color="#4C78A8",  # Modern blue
-                    line=dict(width=1, color="#2E2E2E"),  # Dark outline
-                ),
-                width=0.75,
-                opacity=0.9,
-                hovertemplate="%{x}: %{y:.2f}",
-            )
-        )
+    from transforms import metrics_history
 
-        # TTM value with high-contrast marker
-        latest_date = data[x_col].dt.max()
-        fig.add_trace(
-            go.Scatter(
-                x=[latest_date],
-                y=[ttm_value],
-                mode="markers+text",
-                marker=dict(
-                    size=12,
-                    color="#F28C38",  # Vibrant orange
-                    symbol="diamond",
-                    line=dict(width=2, color="#D76F1E"),  # Darker orange outline
-                ),
-                name="TTM",
-                text=[f"{ttm_value:.2f}"],
-                textposition="top center",
-                textfont=dict(
-                    size=12, color="#2E2E2E", weight="bold"
-                ),  # Dark gray for visibility
-                hovertemplate="TTM: %{y:.2f}",
-            )
-        )
+    with timed("transform", section="key_metrics"):
+        return metrics_history(pl.DataFrame(_metrics_data))
 
-        # TTM reference line
-        fig.add_shape(
-            type="line",
-            x0=data[x_col].dt.min(),
-            y0=ttm_value,
-            x1=latest_date,
-            y1=ttm_value,
-            line=dict(
-                color="#F28C38",
-                width=1.5,
-                dash="dash",
-            ),
-        )
 
-        # Adaptive layout
-        fig.update_layout(
-            title=dict(
-                text=title,
-                font=dict(size=16, color="#2E2E2E"),  # Darker gray for contrast
-                x=0.5,
-                xanchor="center",
-                y=0.95,
-                yanchor="top",
-            ),
-            xaxis_title="Year",
-            yaxis_title=title,
-            plot_bgcolor="rgba(0,0,0,0)",  # Transparent plot
-            paper_bgcolor="rgba(0,0,0,0)",  # Transparent paper
-            height=450,
-            margin=dict(l=60, r=40, t=80, b=60),
-            font=dict(
-                family="Inter, Arial, sans-serif",
-                size=13,
-                color="#2E2E2E",  # Dark gray text
-            ),
-            showlegend=True,
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1,
-                font=dict(size=12),
-                bgcolor="rgba(255,255,255,0.8)",  # Light background for legend on white
-            ),
-            hovermode="x unified",
-            transition_duration=500,
-        )
+@ui_cache(FIGURE_CACHE, shared=True)
+def build_metrics_figure(
+    ticker: str, version: str, metric: str, title: str, ttm_value, _df: pl.DataFrame
+) -> go.Figure:
+    """Builds a valuation metric figure once per ticker, data version and metric"""
+    from charts import create_metrics_bar_chart
 
-        # Enhanced axes
-        fig.update_xaxes(
-            tickmode="array",
-            tickvals=data[x_col],
-            ticktext=data[x_col].dt.strftime("%Y"),
-            gridcolor="rgba(0,0,0,0.2)",  # Darker gridlines for white background
-            linecolor="#666666",
-            linewidth=1,
-            ticks="outside",
-            tickfont=dict(size=12),
-            title_font=dict(size=14),
-            zeroline=False,
+    with timed("figure", section="key_metrics"):
+        fig = create_metrics_bar_chart(
+            _df.select("FYDateEnding", f"{metric}"),
+            x_col="FYDateEnding",
+            y_col=f"{metric}",
+            title=f"{title}",
+            ttm_value=ttm_value,
         )
+        return fig
 
-        fig.update_yaxes(
-            gridcolor="rgba(0,0,0,0.2)",  # Darker gridlines
-            linecolor="#666666",
-            linewidth=1,
-            tickfont=dict(size=12),
-            title_font=dict(size=14),
-            zeroline=False,
-            showline=True,
-        )
 
-        # Enhanced hover
-        fig.update_traces(
-            hoverlabel=dict(
-                bgcolor="#FFFFFF",  # White hover background
-                font_size=12,
-                font_color="#2E2E2E",  # Dark gray text
-                bordercolor="#666666",
-            ),
-        )
-        return fig
+def display_metrics_charts(
+    metrics_data: SectionData,
+    key_metrics_ttm_data: KeyMetricsTTMRecord,
+    ticker: str,
+    version: str,
+):
+    """Displays metrics charts in main area"""
 
     # Create dataframe to use for charts
-    df = (
-        pl.DataFrame(metrics_data)
-        .with_columns(
-            pl.col("date")
-            .str.strptime(pl.Date, format="%Y-%m-%d")
-            .alias("FYDateEnding")
-        )
-        .sort("date")
-        .drop("date")
-    )
+    df = build_metrics_frame(ticker, version, metrics_data)
 
     if df is None or df.is_empty():
         print("Dataframe is empty")
@@ -368,17 +348,10 @@ def display_metrics_charts(
     def plot_chart(metrics: list[tuple[str, str]]):
         """Plots charts for each metric in the list"""
         for metric, title in metrics:
-            ttm_value = key_metrics_ttm_data[f"{metric}_ttm"]
-            dfx = df.select("FYDateEnding", f"{metric}")
+            ttm_value = getattr(key_metrics_ttm_data, f"{metric}_ttm")
 
             st.plotly_chart(
-                create_compact_bar_chart(
-                    dfx,
-                    x_col="FYDateEnding",
-                    y_col=f"{metric}",
-                    title=f"{title}",
-                    ttm_value=ttm_value,
-                ),
+                build_metrics_figure(ticker, version, metric, title, ttm_value, df),
                 use_container_width=True,
             )
 
@@ -418,100 +391,41 @@ def display_metrics_charts(
         plot_chart(col6_metrics)
 
 
-def display_growth_charts(growth_data: list[dict[str, Any]]):
-    """Displays growth charts in main area"""
+@ui_cache(UI_CACHE)
+def build_growth_frame(
+    ticker: str, version: str, _growth_data: SectionData
+) -> pl.DataFrame:
+    """Builds the growth frame once per ticker and data version"""
+    import polars as pl
 
-    def create_compact_bar_chart(data: pl.DataFrame, x_col, y_col, title):
-        fig = go.Figure()
-
-        fig.add_trace(
-            go.Bar(
-                x=data[x_col],
-                y=data[y_col],
-                name="",
-                marker=dict(
-                    color="#54A24B",  # Modern green
-                    line=dict(width=1, color="#2E2E2E"),  # Dark outline
-                ),
-                width=0.7,
-                hovertemplate="%{x}: %{y:.2f}%",
-            )
-        )
+    from transforms import growth_history
 
-        fig.update_layout(
-            title=dict(
-                text=title,
-                font=dict(size=18, color="#2E2E2E"),  # Darker gray
-                x=0.5,
-                xanchor="center",
-                y=0.95,
-                yanchor="top",
-            ),
-            xaxis_title="Year",
-            yaxis_title="Growth Rate (%)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            height=450,
-            margin=dict(l=50, r=50, t=80, b=60),
-            font=dict(
-                family="Inter, Arial, sans-serif",
-                size=13,
-                color="#2E2E2E",  # Dark gray text
-            ),
-            showlegend=False,
-            hovermode="x unified",
-            barmode="group",
-            transition_duration=400,
-        )
+    with timed("transform", section="growth"):
+        return growth_history(pl.DataFrame(_growth_data))
 
-        fig.update_xaxes(
-            tickmode="array",
-            tickvals=data[x_col],
-            ticktext=data[x_col].dt.strftime("%Y"),
-            gridcolor="rgba(0,0,0,0.2)",  # Darker gridlines
-            linecolor="#666666",
-            linewidth=1,
-            ticks="outside",
-            tickfont=dict(size=12),
-            title_font=dict(size=14),
-            zeroline=False,
-        )
 
-        fig.update_yaxes(
-            gridcolor="rgba(0,0,0,0.2)",
-            linecolor="#666666",
-            linewidth=1,
-            ticksuffix="%",
-            tickfont=dict(size=12),
-            title_font=dict(size=14),
-            zeroline=False,
-            showline=True,
-        )
+@ui_cache(FIGURE_CACHE, shared=True)
+def build_growth_figure(
+    ticker: str, version: str, metric: str, title: str, _df: pl.DataFrame
+) -> go.Figure:
+    """Builds a growth figure once per ticker, data version and metric"""
+    from charts import create_growth_bar_chart
 
-        fig.update_traces(
-            opacity=0.95,
-            hoverlabel=dict(
-                bgcolor="#FFFFFF",
-                font_size=12,
-                font_color="#2E2E2E",
-                bordercolor="#666666",
-            ),
+    with timed("figure", section="growth"):
+        fig = create_growth_bar_chart(
+            _df.select("Year", f"{metric}"),
+            x_col="Year",
+            y_col=f"{metric}",
+            title=f"{title}",
         )
-
         return fig
 
+
+def display_growth_charts(growth_data: SectionData, ticker: str, version: str):
+    """Displays growth charts in main area"""
+
     # Create charts
-    df = (
-        pl.DataFrame(growth_data)
-        .with_columns(
-            pl.exclude(["symbol", "date"]).map_elements(
-                lambda x: round(x * 100, 2), return_dtype=pl.Float64
-            ),
-            pl.col("date").str.strptime(pl.Date, format="%Y-%m-%d").alias("Year"),
-        )
-        .sort("date")
-        .drop("date")
-    )
+    df = build_growth_frame(ticker, version, growth_data)
 
     if df is None or df.is_empty():
         print("Dataframe is empty")
@@ -519,15 +433,8 @@ def display_growth_charts(growth_data: list[dict[str, Any]]):
 
     def plot_chart(metrics: list[tuple[str, str]]):
         for metric, title in metrics:
-            dfx = df.select("Year", f"{metric}")
-
             st.plotly_chart(
-                create_compact_bar_chart(
-                    dfx,
-                    x_col="Year",
-                    y_col=f"{metric}",
-                    title=f"{title}",
-                ),
+                build_growth_figure(ticker, version, metric, title, df),
                 use_container_width=True,
             )
 
@@ -562,9 +469,237 @@ def display_growth_charts(growth_data: list[dict[str, Any]]):
         plot_chart(col5_metrics)
 
 
+# Price chart periods in years; None shows the full stored history
+PRICE_PERIODS: dict[str, int | None] = {"1Y": 1, "5Y": 5, "10Y": 10, "Max": None}
+
+
+@ui_cache(FIGURE_CACHE, shared=True)
+def build_price_figure(ticker: str, written_at: float, period: str) -> go.Figure | None:
+    """Builds a downsampled price figure once per ticker, stored version and period"""
+    import polars as pl
+
+    from charts import create_price_chart
+    from prices import scan_prices
+    from transforms import downsample
+
+    lf = scan_prices(ticker)
+    if lf is None:
+        return None
+    years = PRICE_PERIODS[period]
+    if years is not None:
+        lf = lf.filter(
+            pl.col("date") >= pl.col("date").max().dt.offset_by(f"-{years}y")
+        )
+
+    with timed("transform", section="prices"):
+        df = downsample(
+            lf.select("date", "close"), get_settings().price_chart_points
+        ).collect()
+    if df.is_empty():
+        return None
+    with timed("figure", section="prices"):
+        fig = create_price_chart(df, x_col="date", y_col="close", title="Daily Close")
+        return fig
+
+
+def display_price_chart(ticker: str) -> None:
+    """Displays the daily price history in main area"""
+    from prices import get_prices, prices_written_at
+
+    if get_prices(ticker) is None:
+        st.write("Couldn't load price history.")
+        return
+
+    period = st.radio(
+        "Period", list(PRICE_PERIODS), index=1, horizontal=True, key="price_period"
+    )
+    fig = build_price_figure(ticker, prices_written_at(ticker), period)
+    if fig is None:
+        st.write("Couldn't load price history.")
+        return
+    st.plotly_chart(fig, use_container_width=True)
+
+
+# Metrics offered in the compare view per section, as (column, title)
+COMPARE_METRICS: dict[str, list[tuple[str, str]]] = {
+    "key_metrics": [
+        ("rev_per_share", "Rev/Share"),
+        ("pe_ratio", "PE Ratio"),
+        ("fcf_per_share", "FCF/Share"),
+        ("ev_over_ebitda", "EV/EBITDA"),
+        ("ev_to_fcf", "EV/FCF"),
+        ("fcf_yield", "FCF Yield"),
+    ],
+    "growth": [
+        ("rev_growth", "Rev Growth"),
+        ("eps_growth", "EPS Growth"),
+        ("dps_growth", "DPS Growth"),
+        ("fcf_growth", "FCF Growth"),
+        ("debt_growth", "Debt Growth"),
+    ],
+}
+
+
+@ui_cache(UI_CACHE)
+def load_compare(
+    tickers: tuple[str, ...],
+) -> tuple[dict[str, pl.DataFrame | None], list[str], str]:
+    """Fetches the stacked histories of many tickers and their version, once per
+    ticker set and TTL"""
+    from compare import get_histories
+
+    histories, failed = get_histories(list(tickers))
+    payload = b"".join(
+        df.write_json().encode() for df in histories.values() if df is not None
+    )
+    return histories, failed, hashlib.sha1(payload).hexdigest()[:12]
+
+
+@ui_cache(FIGURE_CACHE, shared=True)
+def build_compare_figure(
+    tickers: tuple[str, ...],
+    version: str,
+    metric: str,
+    title: str,
+    kind: str,
+    suffix: str,
+    _df: pl.DataFrame,
+) -> go.Figure:
+    """Builds a comparison figure once per ticker set, data version and metric"""
+    from charts import create_compare_chart
+
+    with timed("figure", section="compare"):
+        fig = create_compare_chart(
+            _df.select("symbol", "FY", metric),
+            x_col="FY",
+            y_col=metric,
+            title=title,
+            kind=kind,
+            suffix=suffix,
+        )
+        return fig
+
+
+def display_compare() -> None:
+    """Displays annual metrics of several tickers side by side"""
+
+    text = st.text_input(
+        "Tickers to compare", placeholder="AAPL, MSFT, GOOGL", key="compare_tickers"
+    )
+    tickers = list(dict.fromkeys(t.upper() for t in text.replace(",", " ").split()))
+    max_tickers = get_settings().compare_max_tickers
+    if len(tickers) > max_tickers:
+        st.warning(f"Comparing the first {max_tickers} tickers.")
+        tickers = tickers[:max_tickers]
+    if not tickers:
+        st.info("Enter the tickers to compare, separated by commas or spaces.")
+        return
+
+    titles = {
+        title: (section, metric)
+        for section, options in COMPARE_METRICS.items()
+        for metric, title in options
+    }
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        selected = st.multiselect(
+            "Metrics", list(titles), default=["PE Ratio", "EV/EBITDA", "Rev Growth"]
+        )
+    with col2:
+        kind = st.radio("Chart", ["Bars", "Lines"], horizontal=True)
+
+    histories, failed, version = load_compare(tuple(tickers))
+    if failed:
+        st.warning(f"No data found for: {', '.join(failed)}")
+
+    columns = st.columns(2)
+    with timed("render", section="compare"):
+        for i, title in enumerate(selected):
+            section, metric = titles[title]
+            df = histories[section]
+            with columns[i % 2]:
+                if df is None or metric not in df.columns:
+                    st.write(f"Couldn't load {title}.")
+                    continue
+                fig = build_compare_figure(
+                    tuple(tickers),
+                    version,
+                    metric,
+                    title,
+                    "bar" if kind == "Bars" else "line",
+                    "%" if section == "growth" else "",
+                    df,
+                )
+                st.plotly_chart(fig, use_container_width=True)
+
+
+@ui_cache(UI_CACHE)
+def load_screener_index(written_at: float) -> pl.DataFrame | None:
+    """Reads the screener index once per written version"""
+    from screener import scan_index
+
+    index = scan_index()
+    return None if index is None else index.collect()
+
+
+def display_screener() -> None:
+    """Displays the screener over the precomputed index"""
+    from screener import index_written_at, screen
+
+    written_at = index_written_at()
+    index = None if written_at is None else load_screener_index(written_at)
+    if index is None:
+        if get_settings().screener_universe:
+            st.info("The screener index is being built. Check back in a few minutes.")
+        else:
+            st.info("Set SCREENER_UNIVERSE to build the screener index.")
+        return
+
+    # Filters, in the units shown in the metric tables
+    sectors = index["sector"].drop_nulls().unique().sort().to_list()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        selected_sectors = st.multiselect("Sector", sectors)
+        max_pe = st.number_input("Max PE", min_value=0.0, value=None, step=1.0)
+    with col2:
+        min_fcf_yield = st.number_input("Min FCF Yield (TTM) %", value=None, step=0.5)
+        min_dvd_yield = st.number_input("Min Div Yield (TTM) %", value=None, step=0.5)
+    with col3:
+        min_score = st.slider("Min Rating Score", 1, 5, 1)
+        min_rev_growth = st.number_input(
+            "Min 5Y Rev Growth/Share %", value=None, step=5.0
+        )
+
+    ranges = {
+        "pe": (None, max_pe),
+        "fcf_yield_ttm": (None if min_fcf_yield is None else min_fcf_yield / 100, None),
+        "dvd_yield_pct_ttm": (min_dvd_yield, None),
+        "rating_score": (min_score if min_score > 1 else None, None),
+        "fiveY_rev_growth_per_share": (
+            None if min_rev_growth is None else min_rev_growth / 100,
+            None,
+        ),
+    }
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        numeric = [c for c in index.columns if index[c].dtype.is_numeric()]
+        sort_by = st.selectbox("Sort by", numeric, index=numeric.index("market_cap"))
+    with col2:
+        descending = st.toggle("Descending", value=True)
+
+    with timed("render", section="screener"):
+        results = screen(index, ranges, selected_sectors, sort_by, descending)
+        st.caption(f"{results.height} of {index.height} tickers")
+        st.dataframe(results, use_container_width=True, hide_index=True)
+
+
 def main():
     """Main function to run StockDataView app"""
 
+    # Serve stage timings when metrics are enabled
+    start_metrics_server()
+
     # Set main page config
     st.set_page_config(
         page_title="Stock Data View",
@@ -607,29 +742,51 @@ def main():
     )
     st.markdown('<div style="height: 10px;"></div>', unsafe_allow_html=True)
 
+    # Rebuild the screener index in the background when a universe is configured
+    if get_settings().screener_universe:
+        from screener import start_screener_job
+
+        start_screener_job()
+
+    # Keep the watchlist warm in the background when one is configured
+    if get_settings().watchlist:
+        from warmer import start_warmer
+
+        start_warmer()
+
+    # Switch between single-ticker analysis, peer comparison and the screener
+    view = st.sidebar.radio("View", ["Ticker", "Compare", "Screener"], horizontal=True)
+    if view == "Screener":
+        display_screener()
+        return
+    if view == "Compare":
+        display_compare()
+        return
+
     # Sidebar for user input
     ticker = st.sidebar.text_input(r"$\textsf{\Large Enter stock symbol:}$")
     analyze_button = st.sidebar.button("Analyze")
 
+    # Keep the analyzed ticker across reruns triggered by other widgets
     if ticker and analyze_button:
+        st.session_state["ticker"] = ticker.strip().upper()
+    ticker = st.session_state.get("ticker")
+
+    if ticker:
+        from data_validation import prefetch_sections
+
+        # Start all endpoints concurrently; each section renders once it resolves
+        if analyze_button:
+            prefetch_sections(ticker)
+
         # Get stock ticker data
-        stock_data = get_validated_stock_data(ticker)
-        if stock_data is None:
+        profile, _ = load_section(ticker, "profile")
+        quote, _ = load_section(ticker, "quote")
+        if not profile or not quote:
             st.write(f"No data found for stock ticker: {ticker}")
         else:
-            profile_data = stock_data["profile"][0]
-            quote_data = stock_data["quote"][0]
-            ratings_data = stock_data["ratings"]
-            key_metrics_ttm_data = stock_data["key_metrics_ttm"][0]
-            key_metrics_data = stock_data["key_metrics"]
-            growth_data = stock_data["growth"]
-
-            table_data = [
-                quote_data,
-                key_metrics_ttm_data,
-                growth_data,
-                ratings_data,
-            ]
+            profile_data = profile[0]
+            quote_data = quote[0]
 
             # Display ticker profile
             display_profile(profile_data)
@@ -639,8 +796,9 @@ def main():
             st.markdown('<div style="height: 10px;"></div>', unsafe_allow_html=True)
             st.markdown('<hr class="custom-divider">', unsafe_allow_html=True)
 
-            # Display metric tables
-            display_metric_tables(table_data)
+            # Placeholder for metric tables
+            tables_slot = st.empty()
+            tables_slot.caption("Loading metric tables...")
 
             # Define layout for metrics and growth charts
             st.markdown('<hr class="custom-divider">', unsafe_allow_html=True)
@@ -652,18 +810,60 @@ def main():
                     """<h4 style="text-align: center;">Valuation Metrics</h4>""",
                     unsafe_allow_html=True,
                 )
-                # Display valuation charts
-                display_metrics_charts(key_metrics_data, key_metrics_ttm_data)
+                metrics_slot = st.empty()
+                metrics_slot.caption("Loading valuation charts...")
             with right:
                 st.markdown(
                     """<h4 style="text-align: center;">Growth Metrics</h4>""",
                     unsafe_allow_html=True,
                 )
-                # Display growth charts
-                display_growth_charts(growth_data)
+                growth_slot = st.empty()
+                growth_slot.caption("Loading growth charts...")
 
             st.divider()
 
+            # Display metric tables
+            ratings_data, _ = load_section(ticker, "ratings")
+            key_metrics_ttm, _ = load_section(ticker, "key_metrics_ttm")
+            growth_data, growth_version = load_section(ticker, "growth")
+            if ratings_data and key_metrics_ttm and growth_data is not None:
+                key_metrics_ttm_data = key_metrics_ttm[0]
+                table_data = [
+                    quote_data,
+                    key_metrics_ttm_data,
+                    growth_data,
+                    ratings_data,
+                ]
+                with tables_slot.container(), timed("render", section="tables"):
+                    display_metric_tables(table_data)
+            else:
+                tables_slot.write("Couldn't load metric tables.")
+
+            # Display valuation charts
+            key_metrics_data, metrics_version = load_section(ticker, "key_metrics")
+            if key_metrics_data is not None and key_metrics_ttm:
+                with metrics_slot.container(), timed("render", section="key_metrics"):
+                    display_metrics_charts(
+                        key_metrics_data, key_metrics_ttm[0], ticker, metrics_version
+                    )
+            else:
+                metrics_slot.write("Couldn't load valuation metrics.")
+
+            # Display growth charts
+            if growth_data is not None:
+                with growth_slot.container(), timed("render", section="growth"):
+                    display_growth_charts(growth_data, ticker, growth_version)
+            else:
+                growth_slot.write("Couldn't load growth metrics.")
+
+            # Display price history
+            st.markdown(
+                """<h4 style="text-align: center;">Price History</h4>""",
+                unsafe_allow_html=True,
+            )
+            with timed("render", section="prices"):
+                display_price_chart(ticker)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,212 @@
+import plotly.graph_objects as go
+import plotly.io as pio
+import polars as pl
+
+TEMPLATE_NAME = "stockdataview"
+
+# Shared chart styling, built and validated once instead of on every chart
+pio.templates[TEMPLATE_NAME] = go.layout.Template(
+    layout={
+        "title": {
+            "font": {"color": "#2E2E2E"},  # Darker gray for contrast
+            "x": 0.5,
+            "xanchor": "center",
+            "y": 0.95,
+            "yanchor": "top",
+        },
+        "plot_bgcolor": "rgba(0,0,0,0)",  # Transparent plot
+        "paper_bgcolor": "rgba(0,0,0,0)",  # Transparent paper
+        "height": 450,
+        "font": {
+            "family": "Inter, Arial, sans-serif",
+            "size": 13,
+            "color": "#2E2E2E",  # Dark gray text
+        },
+        "legend": {
+            "orientation": "h",
+            "yanchor": "bottom",
+            "y": 1.02,
+            "xanchor": "right",
+            "x": 1,
+            "font": {"size": 12},
+            "bgcolor": "rgba(255,255,255,0.8)",  # Light background for legend on white
+        },
+        "hovermode": "x unified",
+        "hoverlabel": {
+            "bgcolor": "#FFFFFF",  # White hover background
+            "font_size": 12,
+            "font_color": "#2E2E2E",  # Dark gray text
+            "bordercolor": "#666666",
+        },
+        "xaxis": {
+            "title": {"text": "Year", "font": {"size": 14}},
+            "tickmode": "array",
+            "gridcolor": "rgba(0,0,0,0.2)",  # Darker gridlines for white background
+            "linecolor": "#666666",
+            "linewidth": 1,
+            "ticks": "outside",
+            "tickfont": {"size": 12},
+            "zeroline": False,
+        },
+        "yaxis": {
+            "title": {"font": {"size": 14}},
+            "gridcolor": "rgba(0,0,0,0.2)",  # Darker gridlines
+            "linecolor": "#666666",
+            "linewidth": 1,
+            "tickfont": {"size": 12},
+            "zeroline": False,
+            "showline": True,
+        },
+    },
+    data={
+        "bar": [
+            go.Bar(
+                marker={"line": {"width": 1, "color": "#2E2E2E"}},  # Dark outline
+            )
+        ],
+    },
+)
+
+
+def year_axis(dates: pl.Series) -> dict:
+    """Returns x axis ticks labelling each fiscal year end by its year"""
+    return {"tickvals": dates, "ticktext": dates.dt.strftime("%Y")}
+
+
+def create_metrics_bar_chart(data: pl.DataFrame, x_col, y_col, title, ttm_value):
+    """Creates a valuation metric bar chart with its TTM marker"""
+    dates = data[x_col]
+    first_date, latest_date = dates.min(), dates.max()
+    return go.Figure(
+        data=[
+            # Historical data bars
+            go.Bar(
+                x=dates,
+                y=data[y_col],
+                name="Historical",
+                marker_color="#4C78A8",  # Modern blue
+                width=0.75,
+                opacity=0.9,
+                hovertemplate="%{x}: %{y:.2f}",
+            ),
+            # TTM value with high-contrast marker
+            go.Scatter(
+                x=[latest_date],
+                y=[ttm_value],
+                mode="markers+text",
+                marker={
+                    "size": 12,
+                    "color": "#F28C38",  # Vibrant orange
+                    "symbol": "diamond",
+                    "line": {"width": 2, "color": "#D76F1E"},  # Darker orange outline
+                },
+                name="TTM",
+                text=[f"{ttm_value:.2f}"],
+                textposition="top center",
+                textfont={"size": 12, "color": "#2E2E2E", "weight": "bold"},
+                hovertemplate="TTM: %{y:.2f}",
+            ),
+        ],
+        layout={
+            "template": TEMPLATE_NAME,
+            "title": {"text": title, "font_size": 16},
+            "yaxis_title_text": title,
+            "margin": {"l": 60, "r": 40, "t": 80, "b": 60},
+            "showlegend": True,
+            "transition_duration": 500,
+            "xaxis": year_axis(dates),
+            # TTM reference line
+            "shapes": [
+                {
+                    "type": "line",
+                    "x0": first_date,
+                    "y0": ttm_value,
+                    "x1": latest_date,
+                    "y1": ttm_value,
+                    "line": {"color": "#F28C38", "width": 1.5, "dash": "dash"},
+                }
+            ],
+        },
+    )
+
+
+def create_growth_bar_chart(data: pl.DataFrame, x_col, y_col, title):
+    """Creates a growth rate bar chart"""
+    dates = data[x_col]
+    return go.Figure(
+        data=[
+            go.Bar(
+                x=dates,
+                y=data[y_col],
+                name="",
+                marker_color="#54A24B",  # Modern green
+                width=0.7,
+                opacity=0.95,
+                hovertemplate="%{x}: %{y:.2f}%",
+            )
+        ],
+        layout={
+            "template": TEMPLATE_NAME,
+            "title": {"text": title, "font_size": 18},
+            "yaxis": {"title_text": "Growth Rate (%)", "ticksuffix": "%"},
+            "margin": {"l": 50, "r": 50, "t": 80, "b": 60},
+            "showlegend": False,
+            "barmode": "group",
+            "transition_duration": 400,
+            "xaxis": year_axis(dates),
+        },
+    )
+
+
+def create_price_chart(data: pl.DataFrame, x_col, y_col, title):
+    """Creates a daily closing price line chart"""
+    return go.Figure(
+        data=[
+            go.Scatter(
+                x=data[x_col],
+                y=data[y_col],
+                mode="lines",
+                name="",
+                line={"color": "#4C78A8", "width": 1.5},  # Modern blue
+                hovertemplate="%{x|%Y-%m-%d}: $%{y:,.2f}",
+            )
+        ],
+        layout={
+            "template": TEMPLATE_NAME,
+            "title": {"text": title, "font_size": 18},
+            "yaxis": {"title_text": "Price ($)", "tickprefix": "$"},
+            "xaxis": {"title_text": "Date", "tickmode": "auto"},
+            "margin": {"l": 60, "r": 40, "t": 80, "b": 60},
+            "showlegend": False,
+        },
+    )
+
+
+def create_compare_chart(
+    data: pl.DataFrame, x_col, y_col, title, kind="bar", suffix=""
+):
+    """Creates grouped bars or overlaid lines of one metric, a trace per symbol"""
+    traces = []
+    for (symbol,), group in data.partition_by(
+        "symbol", as_dict=True, maintain_order=True
+    ).items():
+        if kind == "bar":
+            trace = go.Bar(x=group[x_col], y=group[y_col], name=symbol)
+        else:
+            trace = go.Scatter(
+                x=group[x_col], y=group[y_col], name=symbol, mode="lines+markers"
+            )
+        trace.hovertemplate = f"{symbol}: %{{y:.2f}}{suffix}<extra></extra>"
+        traces.append(trace)
+    return go.Figure(
+        data=traces,
+        layout={
+            "template": TEMPLATE_NAME,
+            "title": {"text": title, "font_size": 16},
+            "yaxis": {"title_text": title, "ticksuffix": suffix},
+            "xaxis": {"title_text": "Fiscal Year", "tickmode": "linear", "dtick": 1},
+            "margin": {"l": 60, "r": 40, "t": 80, "b": 60},
+            "barmode": "group",
+            "showlegend": True,
+        },
+    )
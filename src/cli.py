@@ -0,0 +1,163 @@
+# cli.py
+
+import argparse
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+
+import polars as pl
+
+from data_validation import (
+    METRIC_SECTIONS,
+    DataValidationError,
+    section_frame,
+    validate_section,
+)
+from utils import FMPClient, run_sync, stock_logger
+
+# File formats supported by the export command, also used as file extensions
+EXPORT_FORMATS = ("parquet", "csv", "ndjson")
+
+
+def read_tickers(tickers: Sequence[str], tickers_file: str | None) -> list[str]:
+    """Collects unique, upper-cased tickers from arguments and an optional file"""
+    symbols = list(tickers)
+    if tickers_file:
+        text = (
+            sys.stdin.read() if tickers_file == "-" else Path(tickers_file).read_text()
+        )
+        symbols += text.replace(",", " ").split()
+    return list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+
+
+async def fetch_sections(
+    tickers: list[str], metric_types: list[str], concurrency: int | None = None
+) -> tuple[dict[str, pl.DataFrame], list[str]]:
+    """Fetches and validates sections for many tickers, stacked into one frame per section"""
+    client = FMPClient(metric_types=metric_types)
+    frames: dict[str, list[pl.DataFrame]] = {
+        METRIC_SECTIONS[metric]: [] for metric in metric_types
+    }
+    failed: list[str] = []
+
+    async for ticker, data in client.fetch_many(tickers, concurrency):
+        # A ticker fails when none of its sections could be fetched and validated
+        validated_frames = {}
+        for metric, records in zip(metric_types, data or []):
+            section = METRIC_SECTIONS[metric]
+            if records is None:
+                # The failed request was already logged
+                continue
+            try:
+                validated = validate_section(section, records)
+            except DataValidationError as e:
+                stock_logger().warning(f"Skipped {section} for {ticker}: {e}")
+                continue
+            validated_frames[section] = section_frame(validated)
+
+        if not validated_frames:
+            failed.append(ticker)
+        for section, df in validated_frames.items():
+            frames[section].append(df)
+
+    stacked = {
+        section: pl.concat(parts, how="diagonal_relaxed")
+        for section, parts in frames.items()
+        if parts
+    }
+    return stacked, failed
+
+
+def write_frame(df: pl.DataFrame, path: Path, file_format: str) -> None:
+    """Writes a frame to a Parquet, CSV or NDJSON file"""
+    if file_format == "parquet":
+        df.write_parquet(path)
+    elif file_format == "csv":
+        df.write_csv(path)
+    elif file_format == "ndjson":
+        df.write_ndjson(path)
+    else:
+        raise ValueError(f"Unsupported export format: {file_format}")
+
+
+def export(
+    tickers: list[str],
+    output: Path,
+    file_format: str = "parquet",
+    metric_types: list[str] | None = None,
+    concurrency: int | None = None,
+) -> tuple[list[Path], list[str]]:
+    """Exports validated sections for many tickers, one file per section"""
+    metric_types = metric_types or FMPClient().metric_types
+    frames, failed = run_sync(fetch_sections(tickers, metric_types, concurrency))
+
+    output.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for section, df in frames.items():
+        path = output / f"{section}.{file_format}"
+        write_frame(df, path, file_format)
+        paths.append(path)
+    return paths, failed
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """Parses command line arguments"""
+    parser = argparse.ArgumentParser(
+        prog="stockdataview",
+        description="Fetch, validate and export stock data from the FMP API.",
+    )
+    parser.add_argument("tickers", nargs="*", help="stock symbols, e.g. AAPL MSFT")
+    parser.add_argument(
+        "-f",
+        "--tickers-file",
+        help="file with symbols separated by whitespace or commas, or - for stdin",
+    )
+    parser.add_argument(
+        "-o", "--output", default="export", help="output directory (default: export)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=EXPORT_FORMATS,
+        default="parquet",
+        help="export file format (default: parquet)",
+    )
+    parser.add_argument(
+        "--metrics",
+        nargs="+",
+        choices=list(METRIC_SECTIONS),
+        help="FMP metric types to export (default: all)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="tickers fetched at once (default: the FETCH_CONCURRENCY setting)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Runs the stockdataview export command"""
+    args = parse_args(argv)
+    tickers = read_tickers(args.tickers, args.tickers_file)
+    if not tickers:
+        stock_logger().error("No tickers given")
+        return 2
+
+    paths, failed = export(
+        tickers,
+        Path(args.output),
+        file_format=args.format,
+        metric_types=args.metrics,
+        concurrency=args.concurrency,
+    )
+    for path in paths:
+        stock_logger().info(f"Wrote {path}")
+    if failed:
+        stock_logger().warning(
+            f"No data for {len(failed)} tickers: {', '.join(failed)}"
+        )
+    return 0 if len(failed) < len(tickers) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
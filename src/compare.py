@@ -0,0 +1,94 @@
+# compare.py
+
+import asyncio
+
+import polars as pl
+
+from config import get_settings
+from data_validation import (
+    DataValidationError,
+    aget_validated_section,
+    section_frame,
+)
+from metrics import timed
+from transforms import growth_history, metrics_history
+from utils import run_sync, stock_logger
+
+# Annual histories compared across tickers, with their charting transforms
+COMPARE_SECTIONS = {
+    "key_metrics": metrics_history,
+    "growth": growth_history,
+}
+
+# Date column each transform leaves behind, replaced by the fiscal year
+DATE_COLUMNS = {"key_metrics": "FYDateEnding", "growth": "Year"}
+
+
+async def fetch_histories(
+    tickers: list[str],
+) -> tuple[dict[str, pl.DataFrame], list[str]]:
+    """Fetches the annual histories of many tickers concurrently, stacked into
+    one long frame per section"""
+    sections = list(COMPARE_SECTIONS)
+    semaphore = asyncio.Semaphore(get_settings().fetch_concurrency)
+
+    async def fetch_one(ticker: str, section: str):
+        async with semaphore:
+            return await aget_validated_section(ticker, section)
+
+    results = await asyncio.gather(
+        *(fetch_one(ticker, section) for ticker in tickers for section in sections),
+        return_exceptions=True,
+    )
+
+    frames: dict[str, list[pl.DataFrame]] = {section: [] for section in sections}
+    failed: list[str] = []
+    for i, ticker in enumerate(tickers):
+        found = False
+        for j, section in enumerate(sections):
+            validated = results[i * len(sections) + j]
+            if isinstance(validated, DataValidationError):
+                stock_logger().warning(f"Skipped {section} for {ticker}: {validated}")
+                continue
+            if isinstance(validated, BaseException):
+                raise validated
+            if validated is not None and len(validated):
+                frames[section].append(section_frame(validated))
+                found = True
+        if not found:
+            failed.append(ticker)
+
+    stacked = {
+        section: pl.concat(parts, how="diagonal_relaxed")
+        for section, parts in frames.items()
+        if parts
+    }
+    return stacked, failed
+
+
+def compare_history(section: str, frame: pl.LazyFrame | pl.DataFrame) -> pl.DataFrame:
+    """Prepares a stacked history for charting, keyed by symbol and fiscal year"""
+    date_column = DATE_COLUMNS[section]
+    with timed("transform", section=f"compare_{section}"):
+        return (
+            COMPARE_SECTIONS[section](frame.lazy())
+            .with_columns(pl.col(date_column).dt.year().alias("FY"))
+            .drop(date_column)
+            # Keep the latest report if a ticker changed its fiscal year end
+            .unique(subset=["symbol", "FY"], keep="last", maintain_order=True)
+            .collect()
+        )
+
+
+def get_histories(
+    tickers: list[str],
+) -> tuple[dict[str, pl.DataFrame | None], list[str]]:
+    """Fetches and prepares the annual histories of many tickers for comparison"""
+    stacked, failed = run_sync(fetch_histories(tickers))
+    histories = {
+        section: compare_history(section, stacked[section])
+        if section in stacked
+        else None
+        for section in COMPARE_SECTIONS
+    }
+    return histories, failed
@@ -1,3 +1,6 @@
+from datetime import date, time
+from functools import cache
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -8,7 +11,115 @@ class Settings(BaseSettings):
     rating: str = "rating"
     fmp_api_key: str
 
+    # Shared HTTP client (connection pool, keep-alive, timeouts)
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+    http_timeout: float = 10.0
+    http_connect_timeout: float = 5.0
+    http2: bool = True
+
+    # Retries with jittered exponential backoff, bounded by a per-request deadline
+    retry_attempts: int = 2
+    retry_backoff_base: float = 0.5
+    retry_backoff_max: float = 8.0
+    request_deadline: float = 20.0
+
+    # Circuit breaker: fail fast after consecutive upstream failures
+    breaker_failure_threshold: int = 5
+    breaker_reset_timeout: float = 30.0
+
+    # Global FMP call budget (token bucket) and per-batch fetch concurrency
+    fmp_calls_per_minute: int = 300
+    fmp_rate_burst: int = 10
+    fetch_concurrency: int = 8
+
+    # Symbols per request for endpoints accepting comma-separated symbol lists
+    bulk_chunk_size: int = 50
+
+    # Response cache: TTL in seconds per FMP metric type, bounded by LRU eviction
+    cache_max_entries: int = 2048
+    cache_default_ttl: float = 300.0
+    cache_stale_ttl: float = 86_400.0
+    cache_ttls: dict[str, float] = {
+        "quote": 15.0,
+        "profile": 86_400.0,
+        "rating": 3_600.0,
+        "key-metrics-ttm": 3_600.0,
+        "key-metrics": 86_400.0,
+        "financial-growth": 86_400.0,
+    }
+
+    # On-disk snapshots of validated data, used to warm-start after restarts
+    snapshot_enabled: bool = True
+    snapshot_path: str = "data/snapshots.db"
+
+    # Refresh stored annual histories by fetching only the latest periods
+    incremental_annual: bool = True
+    incremental_limit: int = 2
+
+    # Daily price history, one Parquet file per ticker extended with new bars
+    price_dir: str = "data/prices"
+    price_history_start: date = date(1990, 1, 1)
+    price_refresh_interval: float = 3_600.0
+    price_chart_points: int = 1_000
+
+    # Screener index over a ticker universe, rebuilt in the background
+    screener_universe: list[str] = []
+    screener_index_path: str = "data/screener.parquet"
+    screener_refresh_interval: float = 86_400.0
+    # Share of the previous index's tickers a rebuild must fetch in full to replace it
+    screener_min_coverage: float = 0.9
+
+    # Derived analytics over every stored ticker, written by src/analytics.py
+    analytics_cagr_years: int = 5
+    analytics_path: str = "data/analytics.parquet"
+
+    # Most tickers compared at once in the compare view
+    compare_max_tickers: int = 10
+
+    # Background cache warming for a watchlist; the daily budget caps the upstream
+    # requests of every background job, the screener's included
+    watchlist: list[str] = []
+    warm_daily_call_budget: int = 5_000
+    # Shorter than the quote cache TTL, so polled quotes never expire in between
+    warm_quote_interval: float = 10.0
+    warm_premarket_minutes: int = 30
+    warm_annual_at: time = time(2, 0)
+    market_timezone: str = "America/New_York"
+    market_open: time = time(9, 30)
+    market_close: time = time(16, 0)
+
+    # Times a section that fails validation is re-fetched on its own
+    section_retries: int = 1
+
+    # Validate annual key_metrics and growth histories into polars frames once they
+    # have this many rows; below it, row validation is faster (see the benchmarks)
+    columnar_validation: bool = True
+    columnar_min_rows: int = 100
+
+    # Streamlit caches for validated data, polars frames and Plotly figures
+    ui_cache_ttl: float = 60.0
+    ui_cache_max_entries: int = 256
+    ui_figure_cache_max_entries: int = 2048
+
+    # Stage timings and FMP request metrics, served at /metrics and /metrics.json
+    metrics_enabled: bool = False
+    metrics_host: str = "127.0.0.1"
+    metrics_port: int = 9464
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
 
-settings = Settings()
+@cache
+def get_settings() -> Settings:
+    """Reads settings from the environment and .env on first use"""
+    return Settings()
+
+
+def __getattr__(name: str):
+    # Read the settings on first access of config.settings; modules call
+    # get_settings() where they use them so importing them reads nothing
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,63 +1,363 @@
 # data_validation.py
 
 import asyncio
-from typing import Any, Optional
+import time
+from dataclasses import asdict, is_dataclass
+from functools import cache
+from typing import Any
 
-from pydantic import ValidationError
+import polars as pl
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
-from stock_models import CombinedModel
-from utils import FMPClient, StockData
+from cache import SingleFlight
+from config import get_settings
+from metrics import get_metrics, timed
+from stock_models import (
+    CombinedModel,
+    CompanyProfileRecord,
+    FrameValidationError,
+    Growth,
+    KeyMetrics,
+    KeyMetricsTTMRecord,
+    QuoteRecord,
+    RatingsRecord,
+    frame_from_records,
+)
+from store import SnapshotStore
+from utils import (
+    ANNUAL_METRICS,
+    FMPClient,
+    StockData,
+    cache_key,
+    get_event_loop,
+    get_response_cache,
+    on_event_loop,
+    run_sync,
+    stock_logger,
+)
 
+# Rename some metric types to match with fields defined in the validation
+METRIC_SECTIONS: dict[str, str] = {
+    "profile": "profile",
+    "rating": "ratings",
+    "quote": "quote",
+    "key-metrics-ttm": "key_metrics_ttm",
+    "key-metrics": "key_metrics",
+    "financial-growth": "growth",
+}
 
-async def extract_stock_data(ticker: str) -> Optional[StockData]:
+# Map validated sections back to their metric types
+SECTION_METRICS: dict[str, str] = {
+    section: metric for metric, section in METRIC_SECTIONS.items()
+}
+
+# A validated section: records, model dumps, or a typed frame for columnar sections
+SectionData = list[Any] | pl.DataFrame
+
+# Validated stock data by section; sections that failed validation are None
+ValidatedStockData = dict[str, SectionData | None]
+
+# Validators for each CombinedModel section, e.g. list[Quote] for "quote"
+SECTION_ADAPTERS: dict[str, TypeAdapter] = {
+    name: TypeAdapter(field.annotation)
+    for name, field in CombinedModel.model_fields.items()
+}
+
+# Annual histories loaded straight into polars frames in columnar mode
+COLUMNAR_SECTIONS: dict[str, type[BaseModel]] = {
+    "key_metrics": KeyMetrics,
+    "growth": Growth,
+}
+
+# Single-record sections kept as compact slotted records instead of dicts
+RECORD_SECTIONS: dict[str, type] = {
+    "profile": CompanyProfileRecord,
+    "quote": QuoteRecord,
+    "ratings": RatingsRecord,
+    "key_metrics_ttm": KeyMetricsTTMRecord,
+}
+
+
+@cache
+def get_snapshot_store() -> SnapshotStore:
+    """Returns the local store of validated snapshots; the database itself is
+    opened on first read or write"""
+    return SnapshotStore()
+
+
+# Concurrent sessions analyzing the same ticker share one fetch and validation
+inflight_validations = SingleFlight()
+inflight_sections = SingleFlight()
+
+
+async def extract_stock_data(
+    ticker: str, metric_types: list[str] | None = None
+) -> StockData | None:
     """Pulls source data from Financial Modeling Prep (FMP) API endpoints for a given ticker"""
+    client = FMPClient()
+
+    # Get metric types
+    metric_types = metric_types or client.metric_types
+
     # Get stock data
-    stock_data = await FMPClient().fetch_data(ticker)
+    stock_data = await client.fetch_data(ticker, metric_types)
 
     if stock_data:
-        # Get metric types
-        metric_types = FMPClient().metric_types
-
-        # Rename some metric types to match with fields defined in the validation
-        rename_metric_types: dict[Any, Any] = {
-            "rating": "ratings",
-            "key-metrics": "key_metrics",
-            "key-metrics-ttm": "key_metrics_ttm",
-            "financial-growth": "growth",
-        }
-        new_metric_types = [
-            rename_metric_types.get(item, item) for item in metric_types
-        ]
+        new_metric_types = [METRIC_SECTIONS.get(item, item) for item in metric_types]
 
         # Create combined records dict
         records = dict(zip(new_metric_types, stock_data))
         return records
 
 
+def load_stored_section(
+    ticker: str, section: str
+) -> tuple[float, list[dict[str, Any]]] | None:
+    """Returns when a ticker's section was stored and its records, if stored"""
+    if not get_settings().snapshot_enabled:
+        return None
+    return get_snapshot_store().load_section(ticker, section)
+
+
+def is_fresh(section: str, fetched_at: float) -> bool:
+    """Returns whether a section stored at a time is still within its cache TTL"""
+    settings = get_settings()
+    ttl = settings.cache_ttls.get(SECTION_METRICS[section], settings.cache_default_ttl)
+    return time.time() - fetched_at < ttl
+
+
 class DataValidationError(Exception):
     """Custom exception for validation error"""
 
 
-def get_validated_stock_data(ticker: str) -> Optional[StockData]:
-    """Validates stock data against the CombinedModel schema"""
+async def aget_validated_stock_data(ticker: str) -> ValidatedStockData | None:
+    """Fetches and validates stock data against the CombinedModel schema"""
+    return await on_event_loop(
+        inflight_validations.do(ticker.upper(), lambda: validate_stock_data(ticker))
+    )
+
+
+async def validate_stock_data(ticker: str) -> ValidatedStockData | None:
+    """Fetches, validates and stores stock data for a ticker, section by section"""
 
     # Keep validation errors here
     errors: list[str] = []
 
-    # Extract stock data
-    data = asyncio.run(extract_stock_data(ticker))
+    # Validate each section on its own so one bad endpoint doesn't discard the rest
+    sections = list(SECTION_METRICS)
+    results = await asyncio.gather(
+        *(aget_validated_section(ticker, section) for section in sections),
+        return_exceptions=True,
+    )
 
-    if data is None:
-        return None
-    else:
-        # Validate stock data
-        try:
-            validated_data = CombinedModel(**data).model_dump()
-        except ValidationError as e:
-            errors.append(f"Failed validation: {str(e)}")
+    validated_data: ValidatedStockData = {}
+    for section, result in zip(sections, results):
+        if isinstance(result, DataValidationError):
+            # Mark the section as missing and keep the others
+            errors.append(str(result))
+            result = None
+        elif isinstance(result, BaseException):
+            raise result
+        validated_data[section] = result
+
+    if all(records is None for records in validated_data.values()):
         if errors:
             error_message = "\n".join(errors)
             raise DataValidationError(
                 f"Data validation failed with following errors: \n{error_message}"
             )
-        return validated_data
+        return None
+
+    if errors:
+        missing = [
+            section for section, records in validated_data.items() if records is None
+        ]
+        stock_logger().warning(f"Missing sections for {ticker}: {', '.join(missing)}")
+    return validated_data
+
+
+def get_validated_stock_data(ticker: str) -> ValidatedStockData | None:
+    """Validates stock data against the CombinedModel schema"""
+    return run_sync(aget_validated_stock_data(ticker))
+
+
+def is_columnar(section: str, rows: int) -> bool:
+    """Returns whether a section of some number of rows is validated into a
+    polars frame"""
+    settings = get_settings()
+    return (
+        settings.columnar_validation
+        and section in COLUMNAR_SECTIONS
+        and rows >= settings.columnar_min_rows
+    )
+
+
+def validate_section(section: str, records: list[dict[str, Any]] | None) -> SectionData:
+    """Validates the records of a single section against its model"""
+    try:
+        with timed("validate", section=section):
+            if is_columnar(section, len(records or [])):
+                return frame_from_records(COLUMNAR_SECTIONS[section], records)
+            adapter = SECTION_ADAPTERS[section]
+            models = adapter.validate_python(records)
+            if section in RECORD_SECTIONS:
+                record = RECORD_SECTIONS[section]
+                return [record(**dict(model)) for model in models]
+            return adapter.dump_python(models)
+    except (ValidationError, FrameValidationError) as e:
+        raise DataValidationError(
+            f"Data validation failed with following errors: \n"
+            f"Failed validation of {section}: {str(e)}"
+        )
+
+
+async def aget_validated_section(ticker: str, section: str) -> SectionData | None:
+    """Fetches and validates a single section of stock data"""
+    return await on_event_loop(
+        inflight_sections.do(
+            (ticker.upper(), section), lambda: validate_stock_section(ticker, section)
+        )
+    )
+
+
+async def validate_stock_section(
+    ticker: str, section: str, refresh: bool = False
+) -> SectionData | None:
+    """Fetches, validates and stores one section, independently of the others;
+    a refresh re-fetches it even if a fresh copy is stored or cached"""
+    # Read the stored copy once; it is served if fresh, or extended if stale
+    stored = await asyncio.to_thread(load_stored_section, ticker, section)
+    if stored is not None and not refresh and is_fresh(section, stored[0]):
+        return section_from_records(section, stored[1])
+
+    settings = get_settings()
+    metric = SECTION_METRICS[section]
+    client = FMPClient()
+
+    # Stored annual histories only need their latest periods
+    validated = await refresh_history(
+        client, ticker, section, stored[1] if stored is not None else None
+    )
+
+    for attempt in range(settings.section_retries + 1):
+        if validated is not None:
+            break
+        with timed("fetch", section=section):
+            data = await client.fetch_data(ticker, [metric], refresh)
+        if data is None:
+            return None
+
+        try:
+            validated = validate_section(section, data[0])
+        except DataValidationError:
+            if attempt == settings.section_retries:
+                raise
+            # Drop the bad payload so only this section is fetched again
+            get_response_cache().invalidate(cache_key(metric, ticker))
+
+    if settings.snapshot_enabled:
+        await asyncio.to_thread(
+            get_snapshot_store().save, ticker, {section: section_records(validated)}
+        )
+    return validated
+
+
+def section_records(validated: SectionData) -> list[dict[str, Any]]:
+    """Returns a validated section as records keyed by field name"""
+    if isinstance(validated, pl.DataFrame):
+        return validated.to_dicts()
+    return [asdict(row) if is_dataclass(row) else row for row in validated]
+
+
+def section_frame(validated: SectionData) -> pl.DataFrame:
+    """Returns a validated section as a polars frame"""
+    if isinstance(validated, pl.DataFrame):
+        return validated
+    return pl.DataFrame(section_records(validated), infer_schema_length=None)
+
+
+def section_from_records(section: str, records: list[dict[str, Any]]) -> SectionData:
+    """Rebuilds a validated section from records keyed by field name"""
+    if is_columnar(section, len(records)):
+        return frame_from_records(COLUMNAR_SECTIONS[section], records)
+    if section in RECORD_SECTIONS:
+        return [RECORD_SECTIONS[section](**row) for row in records]
+    return records
+
+
+def merge_history(
+    stored: list[dict[str, Any]], latest: list[dict[str, Any]]
+) -> list[dict[str, Any]] | None:
+    """Merges the latest annual rows into a stored history, newest first.
+
+    Only the newest stored year may change; returns None if an older year was
+    restated or the latest rows don't overlap the stored history."""
+    history = {row["date"]: row for row in stored}
+    newest = max(history)
+    if not any(row["date"] in history for row in latest):
+        return None
+
+    for row in latest:
+        previous = history.get(row["date"])
+        if previous is not None and row["date"] != newest and previous != row:
+            return None
+        history[row["date"]] = row
+    return [history[date] for date in sorted(history, reverse=True)]
+
+
+async def refresh_history(
+    client: FMPClient,
+    ticker: str,
+    section: str,
+    stored: list[dict[str, Any]] | None,
+) -> SectionData | None:
+    """Refreshes a stored annual history by fetching only its latest periods.
+
+    Returns None when there is nothing stored to build on, the latest periods
+    can't be fetched or validated, or a restatement needs the full history."""
+    settings = get_settings()
+    metric = SECTION_METRICS[section]
+    if not (
+        settings.incremental_annual
+        and settings.snapshot_enabled
+        and metric in ANNUAL_METRICS
+    ):
+        return None
+
+    if not stored:
+        return None
+
+    with timed("fetch", section=section):
+        latest = await client.fetch_latest(metric, ticker, settings.incremental_limit)
+    if latest is None:
+        return None
+
+    try:
+        validated = validate_section(section, latest)
+    except DataValidationError:
+        return None
+
+    merged = merge_history(stored, section_records(validated))
+    get_metrics().inc(
+        "incremental_refresh_total",
+        section=section,
+        result="merged" if merged is not None else "restated",
+    )
+    if merged is None:
+        stock_logger().info(f"Restatement in {section} for {ticker}, fetching it all")
+        return None
+
+    # Stored rows were validated when first fetched
+    return section_from_records(section, merged)
+
+
+def get_validated_section(ticker: str, section: str) -> SectionData | None:
+    """Validates a single section of stock data"""
+    return run_sync(aget_validated_section(ticker, section))
+
+
+def prefetch_sections(ticker: str) -> None:
+    """Starts fetching every section concurrently without waiting for them"""
+    loop = get_event_loop()
+    for section in SECTION_METRICS:
+        asyncio.run_coroutine_threadsafe(aget_validated_section(ticker, section), loop)
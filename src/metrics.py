@@ -0,0 +1,228 @@
+import json
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from functools import cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from config import get_settings
+
+# Upper bounds in seconds of the latency histogram buckets
+BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Returned by timed() while disabled, so the hot path only pays for one check
+_DISABLED = nullcontext()
+
+Labels = tuple[tuple[str, str], ...]
+
+
+@dataclass
+class Histogram:
+    """Cumulative latency histogram in the Prometheus bucket layout."""
+
+    counts: list[int] = field(default_factory=lambda: [0] * len(BUCKETS))
+    total: float = 0.0
+    count: int = 0
+
+    def observe(self, value: float) -> None:
+        """Adds one observation"""
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+
+@dataclass
+class Metrics:
+    """In-process counters and timings for the fetch, validate, transform and render stages."""
+
+    enabled: bool = False
+    _counters: dict[tuple[str, Labels], float] = field(default_factory=dict)
+    _histograms: dict[tuple[str, Labels], Histogram] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Adds value to a counter"""
+        if not self.enabled:
+            return
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        """Records a duration in a histogram"""
+        if not self.enabled:
+            return
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def timed(self, stage: str, **labels: Any):
+        """Times a block of code as a pipeline stage, e.g. with metrics.timed("validate")"""
+        if not self.enabled:
+            return _DISABLED
+        return self._timed(stage, labels)
+
+    @contextmanager
+    def _timed(self, stage: str, labels: dict[str, Any]) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(
+                "stage_duration_seconds",
+                time.perf_counter() - start,
+                stage=stage,
+                **labels,
+            )
+
+    def reset(self) -> None:
+        """Drops every recorded value"""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def to_dict(self) -> dict[str, list[dict[str, Any]]]:
+        """Returns all counters and histograms as JSON-friendly dicts"""
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": h.count,
+                    "sum": h.total,
+                    "buckets": dict(zip(map(str, BUCKETS), h.counts)),
+                }
+                for (name, labels), h in sorted(self._histograms.items())
+            ]
+        return {"counters": counters, "histograms": histograms}
+
+    def to_json(self) -> str:
+        """Exports all metrics as JSON"""
+        return json.dumps(self.to_dict())
+
+    def to_prometheus(self) -> str:
+        """Exports all metrics in the Prometheus text exposition format"""
+        lines = []
+        data = self.to_dict()
+        for name in sorted({c["name"] for c in data["counters"]}):
+            lines.append(f"# TYPE stockdataview_{name} counter")
+            for c in data["counters"]:
+                if c["name"] == name:
+                    lines.append(
+                        f"stockdataview_{name}{_format(c['labels'])} {c['value']}"
+                    )
+        for name in sorted({h["name"] for h in data["histograms"]}):
+            lines.append(f"# TYPE stockdataview_{name} histogram")
+            for h in data["histograms"]:
+                if h["name"] != name:
+                    continue
+                for bound, count in h["buckets"].items():
+                    labels = _format({**h["labels"], "le": bound})
+                    lines.append(f"stockdataview_{name}_bucket{labels} {count}")
+                labels = _format({**h["labels"], "le": "+Inf"})
+                lines.append(f"stockdataview_{name}_bucket{labels} {h['count']}")
+                lines.append(
+                    f"stockdataview_{name}_sum{_format(h['labels'])} {h['sum']}"
+                )
+                lines.append(
+                    f"stockdataview_{name}_count{_format(h['labels'])} {h['count']}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = {
+        k: v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for k, v in labels.items()
+    }
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped.items()) + "}"
+
+
+@cache
+def get_metrics() -> Metrics:
+    """Returns the process-wide metrics, off unless METRICS_ENABLED is set"""
+    return Metrics(enabled=get_settings().metrics_enabled)
+
+
+def timed(stage: str, **labels: Any):
+    """Times a block of code as a stage of the process-wide metrics"""
+    return get_metrics().timed(stage, **labels)
+
+
+_server: ThreadingHTTPServer | None = None
+_server_lock = threading.Lock()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serves /metrics in Prometheus text format and /metrics.json as JSON."""
+
+    def do_GET(self) -> None:
+        metrics = get_metrics()
+        if self.path == "/metrics":
+            body, content_type = metrics.to_prometheus(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = metrics.to_json(), "application/json"
+        else:
+            self.send_error(404)
+            return
+        payload = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Keep scrapes out of the app log
+        pass
+
+
+def start_metrics_server(
+    host: str | None = None, port: int | None = None
+) -> ThreadingHTTPServer | None:
+    """Serves the metrics endpoint on a daemon thread, once per process"""
+    global _server
+    if not get_metrics().enabled:
+        return None
+    with _server_lock:
+        if _server is None:
+            settings = get_settings()
+            _server = ThreadingHTTPServer(
+                (
+                    host or settings.metrics_host,
+                    settings.metrics_port if port is None else port,
+                ),
+                MetricsHandler,
+            )
+            threading.Thread(
+                target=_server.serve_forever, name="stockdataview-metrics", daemon=True
+            ).start()
+    return _server
+
+
+def stop_metrics_server() -> None:
+    """Stops the metrics endpoint"""
+    global _server
+    with _server_lock:
+        if _server is not None:
+            _server.shutdown()
+            _server.server_close()
+            _server = None
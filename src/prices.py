@@ -0,0 +1,122 @@
+# prices.py
+
+import asyncio
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+import polars as pl
+
+import utils
+from cache import SingleFlight
+from config import get_settings
+from metrics import get_metrics, timed
+from stock_models import FrameValidationError, HistoricalPrice, frame_from_records
+from store import write_parquet_atomic
+from transforms import parse_date
+from utils import FMPClient, run_sync, stock_logger
+
+PRICE_METRIC = "historical-price-full"
+
+# Concurrent sessions updating the same ticker share one fetch and write
+inflight_updates = SingleFlight()
+
+
+def price_path(ticker: str) -> Path:
+    """Returns the Parquet file holding a ticker's daily prices"""
+    return Path(get_settings().price_dir) / f"{ticker.upper()}.parquet"
+
+
+def scan_prices(ticker: str) -> pl.LazyFrame | None:
+    """Lazily reads a ticker's stored prices, or returns None if there are none"""
+    path = price_path(ticker)
+    return pl.scan_parquet(path) if path.exists() else None
+
+
+def prices_written_at(ticker: str) -> float | None:
+    """Returns when a ticker's prices were last written, or None if there are none"""
+    path = price_path(ticker)
+    return path.stat().st_mtime if path.exists() else None
+
+
+def price_frame(ticker: str, records: list[dict[str, Any]]) -> pl.DataFrame:
+    """Validates daily bars into a typed frame, oldest first"""
+    df = frame_from_records(HistoricalPrice, records)
+    return (
+        df.with_columns(parse_date(), symbol=pl.lit(ticker.upper()))
+        .select("symbol", *df.columns)
+        .sort("date")
+    )
+
+
+def append_prices(ticker: str, latest: pl.DataFrame) -> Path:
+    """Adds the latest bars to the stored prices, replacing any stored bars from
+    the same days, and rewrites the file atomically"""
+    stored = scan_prices(ticker)
+    if stored is not None:
+        older = stored.filter(pl.col("date") < latest["date"].min()).collect()
+        latest = pl.concat([older, latest])
+
+    return write_parquet_atomic(latest, price_path(ticker))
+
+
+def last_price_date(ticker: str) -> date | None:
+    """Returns the date of the latest stored bar"""
+    stored = scan_prices(ticker)
+    if stored is None:
+        return None
+    return stored.select(pl.col("date").max()).collect().item()
+
+
+async def fetch_prices(
+    client: FMPClient, ticker: str, since: date
+) -> list[dict[str, Any]] | None:
+    """Fetches the daily bars of a ticker since a date, bypassing the cache"""
+    url = client.build_url(PRICE_METRIC, ticker, since=since)
+    data = await client.get_data(client.http_client or utils.get_http_client(), url)
+    if not isinstance(data, dict) or not isinstance(data.get("historical"), list):
+        return None
+    return data["historical"]
+
+
+async def update_prices(ticker: str) -> pl.LazyFrame | None:
+    """Extends a ticker's stored prices with the bars since the last stored day"""
+    ticker = ticker.upper()
+    written_at = prices_written_at(ticker)
+    if written_at is not None and (
+        time.time() - written_at < get_settings().price_refresh_interval
+    ):
+        return scan_prices(ticker)
+    return await inflight_updates.do(ticker, lambda: refresh_prices(ticker))
+
+
+async def refresh_prices(ticker: str) -> pl.LazyFrame | None:
+    """Fetches and stores new bars, re-fetching the last stored day in case it
+    was still trading"""
+    since = await asyncio.to_thread(last_price_date, ticker)
+    with timed("fetch", section="prices"):
+        records = await fetch_prices(
+            FMPClient(), ticker, since or get_settings().price_history_start
+        )
+    if records is None:
+        return scan_prices(ticker)
+
+    try:
+        latest = price_frame(ticker, records)
+    except FrameValidationError as e:
+        stock_logger().warning(f"Skipped invalid prices for {ticker}: {e}")
+        return scan_prices(ticker)
+
+    get_metrics().inc("price_rows_fetched_total", latest.height)
+    if not latest.is_empty():
+        await asyncio.to_thread(append_prices, ticker, latest)
+    elif since is not None:
+        # Nothing new, e.g. over a weekend; check again after the refresh interval
+        price_path(ticker).touch()
+    return scan_prices(ticker)
+
+
+def get_prices(ticker: str) -> pl.LazyFrame | None:
+    """Updates and lazily reads a ticker's daily prices"""
+    return run_sync(update_prices(ticker))
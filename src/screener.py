@@ -0,0 +1,240 @@
+# screener.py
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, get_args
+
+import httpx
+import polars as pl
+
+from config import get_settings
+from data_validation import (
+    METRIC_SECTIONS,
+    DataValidationError,
+    section_records,
+    validate_section,
+)
+from metrics import timed
+from stock_models import CombinedModel, polars_dtype
+from store import write_parquet_atomic
+from utils import FMPClient, charged_to, get_event_loop, run_sync, stock_logger
+from warmer import get_call_budget
+
+# Index columns per validated section, as (model field, column name)
+INDEX_FIELDS: dict[str, list[tuple[str, str]]] = {
+    "profile": [
+        ("company_name", "company_name"),
+        ("sector", "sector"),
+        ("industry", "industry"),
+        ("beta", "beta"),
+    ],
+    "quote": [
+        ("price", "price"),
+        ("market_cap", "market_cap"),
+        ("pe", "pe"),
+        ("eps", "eps"),
+        ("change_percent", "change_percent"),
+        ("year_high", "year_high"),
+        ("year_low", "year_low"),
+    ],
+    "ratings": [
+        ("rating", "rating"),
+        ("score", "rating_score"),
+        ("recommendation", "recommendation"),
+    ],
+    "key_metrics_ttm": [
+        ("pe_ratio_ttm", "pe_ratio_ttm"),
+        ("fcf_yield_ttm", "fcf_yield_ttm"),
+        ("dvd_yield_pct_ttm", "dvd_yield_pct_ttm"),
+        ("ev_over_ebitda_ttm", "ev_over_ebitda_ttm"),
+        ("ptb_ratio_ttm", "ptb_ratio_ttm"),
+        ("payout_ratio_ttm", "payout_ratio_ttm"),
+    ],
+    "growth": [
+        ("date", "fiscal_year_end"),
+        ("rev_growth", "rev_growth"),
+        ("eps_growth", "eps_growth"),
+        ("fiveY_rev_growth_per_share", "fiveY_rev_growth_per_share"),
+        ("fiveY_ni_growth_per_share", "fiveY_ni_growth_per_share"),
+        ("fiveY_dps_growth_per_share", "fiveY_dps_growth_per_share"),
+        ("fiveY_opcf_growth_per_share", "fiveY_opcf_growth_per_share"),
+    ],
+}
+
+# Metric types fetched for the index, in the order of INDEX_FIELDS
+INDEX_METRICS: list[str] = [
+    metric for metric, section in METRIC_SECTIONS.items() if section in INDEX_FIELDS
+]
+
+
+def index_schema() -> dict[str, pl.DataType]:
+    """Returns the index columns and their dtypes, taken from the section models"""
+    schema: dict[str, pl.DataType] = {"symbol": pl.String}
+    for section, fields in INDEX_FIELDS.items():
+        (model,) = get_args(CombinedModel.model_fields[section].annotation)
+        for field, column in fields:
+            schema[column] = polars_dtype(model.model_fields[field].annotation)[0]
+    return schema
+
+
+def index_row(ticker: str, data: list[Any]) -> dict[str, Any] | None:
+    """Picks the index columns from the raw responses of one ticker, or returns
+    None if none of its sections could be fetched and validated"""
+    row: dict[str, Any] = {"symbol": ticker}
+    found = False
+    for metric, records in zip(INDEX_METRICS, data):
+        section = METRIC_SECTIONS[metric]
+        if records is None:
+            # The failed request was already logged
+            validated = []
+        else:
+            try:
+                validated = section_records(validate_section(section, records))
+            except DataValidationError:
+                stock_logger().warning(
+                    f"Skipped {section} of {ticker} in screener index"
+                )
+                validated = []
+        found = found or bool(validated)
+
+        # Growth is an annual history; the other sections hold one record
+        if not validated:
+            latest = {}
+        elif section == "growth":
+            latest = max(validated, key=lambda record: record["date"])
+        else:
+            latest = validated[0]
+        for field, column in INDEX_FIELDS[section]:
+            row[column] = latest.get(field)
+    return row if found else None
+
+
+async def build_index(
+    tickers: list[str], concurrency: int | None = None
+) -> pl.DataFrame:
+    """Fetches the index fields for a ticker universe into one frame"""
+    client = FMPClient(metric_types=INDEX_METRICS)
+    rows = []
+    with timed("screener_build"):
+        async for ticker, data in client.fetch_many(tickers, concurrency):
+            row = index_row(ticker, data) if data is not None else None
+            if row is not None:
+                rows.append(row)
+    return pl.DataFrame(rows, schema=index_schema()).sort("symbol")
+
+
+def write_index(df: pl.DataFrame, path: str | None = None) -> Path:
+    """Writes the index to Parquet, replacing the previous file atomically"""
+    return write_parquet_atomic(df, Path(path or get_settings().screener_index_path))
+
+
+def scan_index(path: str | None = None) -> pl.LazyFrame | None:
+    """Lazily reads the index, or returns None if it hasn't been built yet"""
+    target = Path(path or get_settings().screener_index_path)
+    return pl.scan_parquet(target) if target.exists() else None
+
+
+def index_coverage(index: pl.LazyFrame | pl.DataFrame) -> int:
+    """Returns how many tickers have every section of the index, counting a
+    section as present if any of its columns is set"""
+    present = [
+        pl.any_horizontal(pl.col(column).is_not_null() for _, column in fields)
+        for fields in INDEX_FIELDS.values()
+    ]
+    return index.lazy().select(pl.all_horizontal(present).sum()).collect().item()
+
+
+def index_written_at(path: str | None = None) -> float | None:
+    """Returns when the index was last written, or None if there is none"""
+    target = Path(path or get_settings().screener_index_path)
+    return target.stat().st_mtime if target.exists() else None
+
+
+def screen(
+    index: pl.LazyFrame | pl.DataFrame,
+    ranges: dict[str, tuple[float | None, float | None]] | None = None,
+    sectors: list[str] | None = None,
+    sort_by: str = "market_cap",
+    descending: bool = True,
+    limit: int | None = None,
+) -> pl.DataFrame:
+    """Filters the index by column ranges and sectors, then sorts it"""
+    lf = index.lazy()
+    for column, (low, high) in (ranges or {}).items():
+        if low is not None:
+            lf = lf.filter(pl.col(column) >= low)
+        if high is not None:
+            lf = lf.filter(pl.col(column) <= high)
+    if sectors:
+        lf = lf.filter(pl.col("sector").is_in(sectors))
+    lf = lf.sort(sort_by, descending=descending, nulls_last=True)
+    if limit is not None:
+        lf = lf.head(limit)
+    return lf.collect()
+
+
+async def refresh_index(tickers: list[str] | None = None) -> Path | None:
+    """Rebuilds and writes the index for the configured universe"""
+    tickers = tickers or get_settings().screener_universe
+    if not tickers:
+        return None
+    df = await build_index(tickers)
+
+    # An outage or an exhausted call budget leaves tickers or sections out; keep
+    # the previous index rather than replace it with a partial one
+    previous = scan_index()
+    expected = len(tickers)
+    if previous is not None:
+        expected = min(await asyncio.to_thread(index_coverage, previous), expected)
+    covered = index_coverage(df)
+    if df.is_empty() or covered < get_settings().screener_min_coverage * expected:
+        stock_logger().warning(
+            f"Fetched {covered} of {len(tickers)} tickers in full, "
+            "kept the previous screener index"
+        )
+        return None
+    path = await asyncio.to_thread(write_index, df)
+    stock_logger().info(
+        f"Screener index built for {df.height} of {len(tickers)} tickers"
+    )
+    return path
+
+
+async def refresh_index_forever() -> None:
+    """Rebuilds the index whenever it is older than the refresh interval"""
+    while True:
+        written_at = index_written_at()
+        age = None if written_at is None else time.time() - written_at
+        interval = get_settings().screener_refresh_interval
+        if age is None or age >= interval:
+            try:
+                # Shares the daily call budget with the watchlist warmer
+                with charged_to(get_call_budget()):
+                    await refresh_index()
+            except (httpx.HTTPError, OSError, pl.exceptions.PolarsError) as e:
+                stock_logger().error(f"Screener index refresh failed: {e}")
+            age = 0.0
+        await asyncio.sleep(interval - age)
+
+
+_job: Future | None = None
+_job_lock = threading.Lock()
+
+
+def start_screener_job() -> None:
+    """Starts refreshing the index on the background loop, once per process"""
+    global _job
+    if not get_settings().screener_universe:
+        return
+    with _job_lock:
+        if _job is None:
+            _job = asyncio.run_coroutine_threadsafe(
+                refresh_index_forever(), get_event_loop()
+            )
+
+
+if __name__ == "__main__":
+    run_sync(refresh_index())
@@ -1,23 +1,31 @@
-from typing import Optional
+from dataclasses import make_dataclass
+from types import NoneType
+from typing import Any, get_args
 
-from pydantic import BaseModel, Field
+import polars as pl
+from pydantic import BaseModel, ConfigDict, Field
 
 
-class CompanyProfile(BaseModel):
+class StockModel(BaseModel):
+    # Accept field names as well as FMP aliases, so stored dumps re-validate
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class CompanyProfile(StockModel):
     symbol: str
     beta: float
     range: str
     company_name: str = Field(..., alias="companyName")
-    sector: Optional[str] = None
-    industry: Optional[str] = None
-    description: Optional[str] = None
-    image: Optional[str] = None
+    sector: str | None = None
+    industry: str | None = None
+    description: str | None = None
+    image: str | None = None
 
 
-class Quote(BaseModel):
+class Quote(StockModel):
     symbol: str
     price: float
-    change_percent: Optional[float] = Field(..., alias="changesPercentage")
+    change_percent: float | None = Field(..., alias="changesPercentage")
     year_high: float = Field(..., alias="yearHigh")
     year_low: float = Field(..., alias="yearLow")
     market_cap: float = Field(..., alias="marketCap")
@@ -28,7 +36,7 @@ class Quote(BaseModel):
     shares_outstanding: int = Field(..., alias="sharesOutstanding")
 
 
-class Ratings(BaseModel):
+class Ratings(StockModel):
     symbol: str
     date: str
     rating: str
@@ -48,7 +56,7 @@ class Ratings(BaseModel):
     pb_rec: str = Field(..., alias="ratingDetailsPBRecommendation")
 
 
-class KeyMetricsTTM(BaseModel):
+class KeyMetricsTTM(StockModel):
     rev_per_share_ttm: float | None = Field(..., alias="revenuePerShareTTM")
     net_income_per_share_ttm: float | None = Field(..., alias="netIncomePerShareTTM")
     fcf_per_share_ttm: float | None = Field(..., alias="freeCashFlowPerShareTTM")
@@ -64,7 +72,7 @@ class KeyMetricsTTM(BaseModel):
     payout_ratio_ttm: float | None = Field(..., alias="payoutRatioTTM")
 
 
-class KeyMetrics(BaseModel):
+class KeyMetrics(StockModel):
     symbol: str
     date: str
     rev_per_share: float | None = Field(..., alias="revenuePerShare")
@@ -75,7 +83,7 @@ class KeyMetrics(BaseModel):
     fcf_yield: float | None = Field(..., alias="freeCashFlowYield")
 
 
-class Growth(BaseModel):
+class Growth(StockModel):
     symbol: str
     date: str
     rev_growth: float | None = Field(..., alias="revenueGrowth")
@@ -97,6 +105,16 @@ class Growth(BaseModel):
     )
 
 
+class HistoricalPrice(StockModel):
+    date: str
+    open: float
+    high: float
+    low: float
+    close: float
+    adj_close: float = Field(..., alias="adjClose")
+    volume: float
+
+
 class CombinedModel(BaseModel):
     profile: list[CompanyProfile]
     quote: list[Quote]
@@ -104,3 +122,105 @@ class CombinedModel(BaseModel):
     key_metrics_ttm: list[KeyMetricsTTM]
     key_metrics: list[KeyMetrics]
     growth: list[Growth]
+
+
+def record_type(model: type[BaseModel]) -> type:
+    """Builds a frozen, slotted dataclass with the fields of a model"""
+    return make_dataclass(
+        f"{model.__name__}Record",
+        [(name, f.annotation) for name, f in model.model_fields.items()],
+        frozen=True,
+        slots=True,
+        module=__name__,
+    )
+
+
+# Compact, immutable records for the single-record sections kept per ticker
+CompanyProfileRecord = record_type(CompanyProfile)
+QuoteRecord = record_type(Quote)
+RatingsRecord = record_type(Ratings)
+KeyMetricsTTMRecord = record_type(KeyMetricsTTM)
+
+
+class FrameValidationError(ValueError):
+    """Raised when records don't fit a model's columnar schema"""
+
+
+def polars_dtype(annotation: Any) -> tuple[pl.DataType, bool]:
+    """Maps a model field annotation to a polars dtype and its nullability"""
+    args = get_args(annotation) or (annotation,)
+    types = {arg for arg in args if arg is not NoneType}
+    if types == {str}:
+        dtype = pl.String
+    elif types == {int}:
+        dtype = pl.Int64
+    else:
+        dtype = pl.Float64
+    return dtype, NoneType in args
+
+
+def frame_from_records(
+    model: type[BaseModel], records: list[dict[str, Any]] | None
+) -> pl.DataFrame:
+    """Validates records straight into a typed polars frame with the model's
+    field names, aliases and nullability; like the model, every required key
+    must be present and values must fit the field type"""
+    if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+        raise FrameValidationError(f"{model.__name__}: expected a list of records")
+
+    fields = {
+        name: polars_dtype(f.annotation) for name, f in model.model_fields.items()
+    }
+    if not records:
+        return pl.DataFrame(schema={name: dtype for name, (dtype, _) in fields.items()})
+
+    # Accept FMP aliases or field names, like populate_by_name does
+    first = records[0]
+    sources = {
+        name: f.alias if f.alias in first else name
+        for name, f in model.model_fields.items()
+    }
+    required = {
+        sources[name]: name for name, f in model.model_fields.items() if f.is_required()
+    }
+    for record in records:
+        missing = required.keys() - record.keys()
+        if missing:
+            name = required[min(missing)]
+            raise FrameValidationError(f"{model.__name__}.{name}: field required")
+
+    # Values of mixed or nested types don't fit one column
+    try:
+        df = pl.DataFrame(
+            records, schema=list(sources.values()), infer_schema_length=None
+        )
+    except (pl.exceptions.PolarsError, TypeError, ValueError) as e:
+        raise FrameValidationError(f"{model.__name__}: {e}")
+
+    columns = []
+    for name, (dtype, nullable) in fields.items():
+        source = sources[name]
+        column = df[source]
+        if not (column.dtype.is_numeric() or column.dtype in (pl.String, pl.Null)):
+            raise FrameValidationError(f"{model.__name__}.{name}: expected {dtype}")
+        # Polars reads numbers mixed into a string column as strings
+        if dtype == pl.String and (
+            column.dtype not in (pl.String, pl.Null)
+            or any(not isinstance(r[source], (str, NoneType)) for r in records)
+        ):
+            raise FrameValidationError(f"{model.__name__}.{name}: expected a string")
+        # Integer fields accept whole floats only, not truncated ones
+        if (
+            dtype == pl.Int64
+            and column.dtype.is_float()
+            and (column != column.round()).any()
+        ):
+            raise FrameValidationError(f"{model.__name__}.{name}: expected {dtype}")
+        try:
+            column = column.cast(dtype, strict=True)
+        except pl.exceptions.InvalidOperationError:
+            raise FrameValidationError(f"{model.__name__}.{name}: expected {dtype}")
+        if not nullable and column.null_count():
+            raise FrameValidationError(f"{model.__name__}.{name}: may not be null")
+        columns.append(column.alias(name))
+    return pl.DataFrame(columns)
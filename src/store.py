@@ -0,0 +1,153 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from config import get_settings
+
+if TYPE_CHECKING:
+    import polars as pl
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    ticker TEXT NOT NULL,
+    fetch_date TEXT NOT NULL,
+    section TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (ticker, fetch_date, section)
+)
+"""
+
+
+@dataclass
+class SnapshotStore:
+    """SQLite store of validated stock data sections per ticker and fetch date."""
+
+    path: str = field(default_factory=lambda: get_settings().snapshot_path)
+    _conn: sqlite3.Connection | None = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def connect(self) -> sqlite3.Connection:
+        """Opens the database on first use"""
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(SCHEMA)
+        return self._conn
+
+    def save(
+        self,
+        ticker: str,
+        data: dict[str, list[dict[str, Any]]],
+        fetch_date: date | None = None,
+    ) -> None:
+        """Saves validated sections for a ticker under a fetch date"""
+        fetch_date = fetch_date or date.today()
+        fetched_at = time.time()
+        rows = [
+            (
+                ticker.upper(),
+                fetch_date.isoformat(),
+                section,
+                fetched_at,
+                json.dumps(records),
+            )
+            for section, records in data.items()
+        ]
+        with self._lock:
+            conn = self.connect()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?)", rows
+                )
+
+    def load_sections(
+        self, ticker: str, fetch_date: date | None = None
+    ) -> dict[str, tuple[float, list[dict[str, Any]]]]:
+        """Returns the latest (fetched_at, records) per section for a ticker"""
+        query = """
+            SELECT section, payload, MAX(fetched_at)
+            FROM snapshots
+            WHERE ticker = ? AND fetch_date <= ?
+            GROUP BY section
+        """
+        fetch_date = fetch_date or date.max
+        with self._lock:
+            rows = (
+                self.connect()
+                .execute(query, (ticker.upper(), fetch_date.isoformat()))
+                .fetchall()
+            )
+        return {
+            section: (fetched_at, json.loads(payload))
+            for section, payload, fetched_at in rows
+        }
+
+    def load_section(
+        self, ticker: str, section: str
+    ) -> tuple[float, list[dict[str, Any]]] | None:
+        """Returns the latest (fetched_at, records) of one section for a ticker"""
+        query = """
+            SELECT payload, fetched_at
+            FROM snapshots
+            WHERE ticker = ? AND section = ?
+            ORDER BY fetched_at DESC
+            LIMIT 1
+        """
+        with self._lock:
+            row = self.connect().execute(query, (ticker.upper(), section)).fetchone()
+        return None if row is None else (row[1], json.loads(row[0]))
+
+    def load(
+        self, ticker: str, fetch_date: date | None = None
+    ) -> dict[str, list[dict[str, Any]]] | None:
+        """Returns the latest stored payload for a ticker, as of a fetch date"""
+        sections = self.load_sections(ticker, fetch_date)
+        if not sections:
+            return None
+        return {section: records for section, (_, records) in sections.items()}
+
+    def load_universe(self, section: str) -> dict[str, list[dict[str, Any]]]:
+        """Returns the latest stored records of a section for every ticker"""
+        query = """
+            SELECT ticker, payload, MAX(fetched_at)
+            FROM snapshots
+            WHERE section = ?
+            GROUP BY ticker
+        """
+        with self._lock:
+            rows = self.connect().execute(query, (section,)).fetchall()
+        return {ticker: json.loads(payload) for ticker, payload, _ in rows}
+
+    def fetch_dates(self, ticker: str) -> list[str]:
+        """Lists the fetch dates stored for a ticker, newest first"""
+        query = (
+            "SELECT DISTINCT fetch_date FROM snapshots WHERE ticker = ? ORDER BY 1 DESC"
+        )
+        with self._lock:
+            rows = self.connect().execute(query, (ticker.upper(),)).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        """Closes the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def write_parquet_atomic(df: "pl.DataFrame", path: Path) -> Path:
+    """Writes a frame to Parquet through a partial file that then replaces the
+    target, so readers never see a half-written file"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(".partial")
+    df.write_parquet(partial)
+    os.replace(partial, path)
+    return path
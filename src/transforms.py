@@ -0,0 +1,59 @@
+from collections.abc import Iterable
+
+import polars as pl
+import polars.selectors as cs
+
+
+def parse_date(column: str = "date", alias: str | None = None) -> pl.Expr:
+    """Parses an FMP YYYY-MM-DD string column into a Date"""
+    return pl.col(column).str.to_date("%Y-%m-%d").alias(alias or column)
+
+
+def as_percent(columns: Iterable[str] | None = None, decimals: int = 2) -> pl.Expr:
+    """Turns ratios into percentages rounded to decimals; nulls stay null"""
+    selected = cs.numeric() if columns is None else pl.col(list(columns))
+    return (selected * 100).round(decimals)
+
+
+# History helpers work the same on eager frames and on lazy multi-ticker scans
+def prepare_history[Frame: (pl.DataFrame, pl.LazyFrame)](
+    frame: Frame,
+    date_alias: str,
+    percent: pl.Expr | None = None,
+) -> Frame:
+    """Parses dates, optionally converts to percentages and sorts each ticker's
+    history oldest first, replacing the date column with date_alias"""
+    exprs = [parse_date("date", date_alias)]
+    if percent is not None:
+        exprs.append(percent)
+    return frame.with_columns(exprs).sort(["symbol", date_alias]).drop("date")
+
+
+def metrics_history[Frame: (pl.DataFrame, pl.LazyFrame)](frame: Frame) -> Frame:
+    """Prepares annual key metrics for charting"""
+    return prepare_history(frame, "FYDateEnding")
+
+
+def growth_history[Frame: (pl.DataFrame, pl.LazyFrame)](frame: Frame) -> Frame:
+    """Prepares annual growth rates for charting, as percentages"""
+    return prepare_history(frame, "Year", percent=as_percent())
+
+
+def downsample[Frame: (pl.DataFrame, pl.LazyFrame)](
+    frame: Frame, points: int, x: str = "date", y: str = "close"
+) -> Frame:
+    """Min/max bucketing: keeps the first and last rows and the lowest and highest
+    y of each of points/2 equal-count buckets, in x order, so peaks and troughs
+    survive at about points rows"""
+    buckets = max(points // 2, 1)
+    row = pl.int_range(pl.len())
+    bucket = row * buckets // pl.len()
+    keep = (
+        (row == 0)
+        | (row == pl.len() - 1)
+        | (pl.col(y) == pl.col(y).min().over(bucket))
+        | (pl.col(y) == pl.col(y).max().over(bucket))
+    )
+    # Flat stretches tie on min or max; keep only one of each tied value
+    first = pl.struct(bucket, pl.col(y)).is_first_distinct() | (row == pl.len() - 1)
+    return frame.sort(x).filter(keep & first)
@@ -1,16 +1,37 @@
 import asyncio
+import atexit
 import logging
+import random
 import sys
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass, field
-from typing import Any, Optional
+from datetime import date
+from email.utils import parsedate_to_datetime
+from functools import cache
+from typing import Any
 
 import httpx
 
-from config import settings
+from cache import SingleFlight, TTLCache
+from config import get_settings
+from metrics import get_metrics
 
 # Define stock data type
 StockData = dict[str, list[dict[str, Any]]]
 
+# Metric types fetched as annual histories
+ANNUAL_METRICS = ("key-metrics", "financial-growth")
+
+# Metric types accepting comma-separated symbol lists
+BULK_METRICS = ("profile", "quote")
+
+# Transient upstream responses worth retrying
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
 
 def stock_logger():
     """Configures logging for stock data dashboard project"""
@@ -24,12 +45,293 @@ def stock_logger():
     return logging.getLogger(__name__)
 
 
+# Process-wide event loop and HTTP client, shared across Streamlit reruns and sessions
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+_http_client: httpx.AsyncClient | None = None
+_http_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+@cache
+def get_response_cache() -> TTLCache:
+    """Returns the process-wide cache of FMP responses keyed by (metric, ticker,
+    period), created on first use"""
+    settings = get_settings()
+    return TTLCache(
+        max_entries=settings.cache_max_entries, stale_ttl=settings.cache_stale_ttl
+    )
+
+
+# Concurrent requests for the same (metric, ticker, period) share one HTTP call
+inflight_requests = SingleFlight()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Returns the background event loop, starting it on first use"""
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever, name="stockdataview-loop", daemon=True
+            ).start()
+    return _loop
+
+
+def run_sync(coro):
+    """Runs a coroutine on the background event loop and waits for its result"""
+    loop = get_event_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+
+    # Blocking the background loop on itself would deadlock
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync called from the background loop; await instead")
+    # Sync callers from every session run on this one loop, so they share its
+    # pooled connections and in-flight fetches
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+async def on_event_loop(coro):
+    """Awaits a coroutine on the background event loop from any event loop"""
+    loop = get_event_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    # Shared fetches and pooled connections are bound to the background loop
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Returns the shared HTTP client for the running event loop"""
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+
+    # Pooled connections are bound to the loop that opened them
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        settings = get_settings()
+        _http_client = httpx.AsyncClient(
+            http2=settings.http2,
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                settings.http_timeout, connect=settings.http_connect_timeout
+            ),
+        )
+        _http_client_loop = loop
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Closes the shared HTTP client and its pooled connections"""
+    global _http_client, _http_client_loop
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+    _http_client_loop = None
+
+
+@atexit.register
+def shutdown() -> None:
+    """Closes the shared HTTP client and stops the background event loop"""
+    global _loop
+    with _loop_lock:
+        loop, _loop = _loop, None
+    if loop is None or loop.is_closed():
+        return
+    if _http_client_loop is loop:
+        asyncio.run_coroutine_threadsafe(close_http_client(), loop).result(timeout=5)
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def cache_key(metric: str, ticker: str) -> tuple[str, str, str | None]:
+    """Builds the response cache key (metric, ticker, period)"""
+    period = "annual" if metric in ANNUAL_METRICS else None
+    return (metric, ticker.upper(), period)
+
+
+def cache_response(metric: str, ticker: str, data: Any) -> None:
+    """Caches a metric response with the metric's TTL"""
+    # Only cache non-empty payloads, never errors
+    if isinstance(data, list) and data:
+        settings = get_settings()
+        ttl = settings.cache_ttls.get(metric, settings.cache_default_ttl)
+        get_response_cache().set(cache_key(metric, ticker), data, ttl=ttl)
+
+
+@dataclass
+class RateLimiter:
+    """A token bucket shared by every FMP call in the process."""
+
+    calls_per_minute: float
+    burst: int = 1
+    clock: Callable[[], float] = time.monotonic
+    _tokens: float | None = field(default=None, repr=False)
+    _updated: float = field(default=0.0, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    async def acquire(self) -> None:
+        """Waits until a call is allowed by the budget"""
+        rate = self.calls_per_minute / 60
+        while True:
+            with self._lock:
+                now = self.clock()
+                if self._tokens is None:
+                    self._tokens = float(self.burst)
+                else:
+                    elapsed = now - self._updated
+                    self._tokens = min(self.burst, self._tokens + elapsed * rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / rate
+            await asyncio.sleep(wait)
+
+
+@dataclass
+class CircuitBreaker:
+    """Fails fast while upstream is down, letting one probe through per cool-down."""
+
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+    clock: Callable[[], float] = time.monotonic
+    failures: int = 0
+    opened_at: float | None = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def state(self) -> str:
+        """Returns closed, open or half-open"""
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Returns whether a call may go upstream"""
+        with self._lock:
+            state = self.state
+            if state == "half-open":
+                # Re-arm so only this call probes until it reports back
+                self.opened_at = self.clock()
+            return state != "open"
+
+    def record_success(self) -> None:
+        """Closes the breaker after a successful call"""
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        """Counts a failed call, opening the breaker at the threshold"""
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+
+
+@dataclass
+class CallBudget:
+    """Caps the upstream requests made by background jobs per day."""
+
+    limit: int
+    clock: Callable[[], date] = date.today
+    day: date | None = None
+    spent: int = 0
+
+    def remaining(self) -> int:
+        """Returns the requests left for the day"""
+        today = self.clock()
+        if self.day != today:
+            self.day, self.spent = today, 0
+        return self.limit - self.spent
+
+    def try_spend(self, calls: int = 1) -> bool:
+        """Charges requests to the day, or returns False if they would exceed it"""
+        if calls > self.remaining():
+            return False
+        self.spent += calls
+        return True
+
+
+# Budget charged for each upstream request made in the current context, if any
+job_budget: ContextVar[CallBudget | None] = ContextVar("job_budget", default=None)
+
+
+@contextmanager
+def charged_to(budget: CallBudget) -> Iterator[None]:
+    """Charges the upstream requests made in a block, including by the tasks it
+    starts, to a background job's budget"""
+    token = job_budget.set(budget)
+    try:
+        yield
+    finally:
+        job_budget.reset(token)
+
+
+def record_request(url: str, response: httpx.Response | str, seconds: float) -> None:
+    """Records latency, status and payload size of one FMP request"""
+    metrics = get_metrics()
+    if not metrics.enabled:
+        return
+    endpoint = httpx.URL(url).path.rsplit("/", 2)[-2]
+    metrics.observe("fmp_request_duration_seconds", seconds, endpoint=endpoint)
+    if isinstance(response, str):
+        metrics.inc("fmp_responses_total", endpoint=endpoint, status=response)
+        return
+    metrics.inc("fmp_responses_total", endpoint=endpoint, status=response.status_code)
+    metrics.inc("fmp_response_bytes_total", len(response.content), endpoint=endpoint)
+
+
+def retry_delay(attempt: int, retry_after: str | None = None) -> float:
+    """Returns the wait before a retry, honoring a Retry-After header"""
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(retry_after).timestamp()
+                return max(0.0, retry_at - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    # Exponential backoff with jitter
+    settings = get_settings()
+    backoff = min(settings.retry_backoff_max, settings.retry_backoff_base * 2**attempt)
+    return random.uniform(backoff / 2, backoff)
+
+
+@cache
+def get_circuit_breaker() -> CircuitBreaker:
+    """Returns the process-wide breaker shared by every FMP call"""
+    settings = get_settings()
+    return CircuitBreaker(
+        failure_threshold=settings.breaker_failure_threshold,
+        reset_timeout=settings.breaker_reset_timeout,
+    )
+
+
+@cache
+def get_rate_limiter() -> RateLimiter:
+    """Returns the process-wide limiter matched to the FMP plan's calls per minute"""
+    settings = get_settings()
+    return RateLimiter(settings.fmp_calls_per_minute, burst=settings.fmp_rate_burst)
+
+
 @dataclass
 class FMPClient:
     """A client for interacting with the Financial Modeling Prep API."""
 
-    base_url: str = settings.base_url
-    api_key: str = settings.fmp_api_key
+    base_url: str = field(default_factory=lambda: get_settings().base_url)
+    api_key: str = field(default_factory=lambda: get_settings().fmp_api_key)
     metric_types: list[str] = field(
         default_factory=lambda: [
             "profile",
@@ -40,34 +342,192 @@ class FMPClient:
             "financial-growth",
         ]
     )  #
+    http_client: httpx.AsyncClient | None = None
 
     async def get_data(
-        self, client: httpx.Client, url: str
-    ) -> Optional[dict[str, Any]]:
-        """Call API endpoint asynchronously"""
-        try:
-            response = await client.get(url)
-            data = response.json()
-            return data
-        except Exception as e:
-            stock_logger().error(f"Error fetching data from {url}: {e}")
+        self, client: httpx.AsyncClient, url: str
+    ) -> dict[str, Any] | None:
+        """Call API endpoint asynchronously, retrying transient failures"""
+        settings, circuit_breaker = get_settings(), get_circuit_breaker()
+        if not circuit_breaker.allow():
+            stock_logger().warning(f"Circuit open, skipped request to {url}")
             return None
 
-    async def fetch_data(self, ticker: str) -> Optional[StockData]:
-        """Extracts data asynchronously from multiple FMP endpoints"""
-        urls = []
-        for metric in self.metric_types:
-            if metric in ["profile", "quote", "rating", "key-metrics-ttm"]:
-                endpoint = f"{self.base_url}/{metric}/{ticker}?apikey={self.api_key}"
+        loop = asyncio.get_running_loop()
+        deadline = None
+        budget = job_budget.get()
+        for attempt in range(settings.retry_attempts + 1):
+            # Background jobs pay for every request they make, retries included
+            if budget is not None and not budget.try_spend():
+                stock_logger().warning(
+                    f"Call budget exhausted, skipped request to {url}"
+                )
+                return None
+            retry_after = None
+            try:
+                await get_rate_limiter().acquire()
+                # The deadline covers upstream time, not the wait for a token
+                if deadline is None:
+                    deadline = loop.time() + settings.request_deadline
+                elif loop.time() >= deadline:
+                    break
+                start = time.perf_counter()
+                try:
+                    response = await asyncio.wait_for(
+                        client.get(url), timeout=deadline - loop.time()
+                    )
+                except (httpx.HTTPError, TimeoutError):
+                    record_request(url, "error", time.perf_counter() - start)
+                    raise
+                record_request(url, response, time.perf_counter() - start)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    circuit_breaker.record_success()
+                    data = response.json()
+                    return data
+                retry_after = response.headers.get("Retry-After")
+                error = f"HTTP {response.status_code}"
+            except (httpx.TransportError, TimeoutError) as e:
+                error = str(e) or type(e).__name__
+            except (httpx.HTTPError, ValueError) as e:
+                # Other client errors and malformed JSON aren't worth retrying
+                stock_logger().error(f"Error fetching data from {url}: {e}")
+                return None
+
+            # Give up once out of attempts or past the request deadline
+            delay = retry_delay(attempt, retry_after)
+            if attempt == settings.retry_attempts or loop.time() + delay >= deadline:
+                break
+            await asyncio.sleep(delay)
+
+        circuit_breaker.record_failure()
+        stock_logger().error(f"Error fetching data from {url}: {error}")
+        return None
+
+    def build_url(
+        self,
+        metric: str,
+        ticker: str,
+        limit: int | None = None,
+        since: date | None = None,
+    ) -> str:
+        """Builds the endpoint URL for a metric type and ticker, optionally limited
+        to the latest periods or to the days since a date"""
+        query = "period=annual&" if metric in ANNUAL_METRICS else ""
+        if limit is not None:
+            query += f"limit={limit}&"
+        if since is not None:
+            query += f"from={since.isoformat()}&"
+        return f"{self.base_url}/{metric}/{ticker}?{query}apikey={self.api_key}"
+
+    async def fetch_latest(
+        self, metric: str, ticker: str, limit: int
+    ) -> list[dict[str, Any]] | None:
+        """Fetches only the latest periods of an annual metric, bypassing the cache"""
+        client = self.http_client or get_http_client()
+        data = await self.get_data(client, self.build_url(metric, ticker, limit))
+        return data if isinstance(data, list) and data else None
+
+    async def get_metric(
+        self,
+        client: httpx.AsyncClient,
+        metric: str,
+        ticker: str,
+        refresh: bool = False,
+    ) -> Any | None:
+        """Calls a metric endpoint, serving fresh responses from the cache unless
+        refreshing; a refresh keeps the cached copy until it is replaced"""
+        key = cache_key(metric, ticker)
+        if not refresh:
+            data = get_response_cache().get(key)
+            get_metrics().inc(
+                "cache_requests_total",
+                metric=metric,
+                result="miss" if data is None else "hit",
+            )
+            if data is not None:
+                return data
+
+        async def fetch() -> Any | None:
+            data = await self.get_data(client, self.build_url(metric, ticker))
+            cache_response(metric, ticker, data)
+
+            # Serve the last known response while upstream is failing
+            if data is None:
+                stale = get_response_cache().get_stale(key)
+                if stale is not None:
+                    stock_logger().warning(f"Serving stale {metric} for {ticker}")
+                    return stale
+            return data
+
+        return await inflight_requests.do(key, fetch)
+
+    async def fetch_bulk(
+        self,
+        client: httpx.AsyncClient,
+        metric: str,
+        tickers: Iterable[str],
+        refresh: bool = False,
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Fetches a bulk metric for many tickers with comma-separated symbol lists,
+        serving cached tickers unless refreshing"""
+        results: dict[str, list[dict[str, Any]]] = {}
+        missing: list[str] = []
+        for ticker in dict.fromkeys(t.upper() for t in tickers):
+            cached = (
+                None if refresh else get_response_cache().get(cache_key(metric, ticker))
+            )
+            if cached is not None:
+                results[ticker] = cached
             else:
-                endpoint = f"{self.base_url}/{metric}/{ticker}?period=annual&apikey={self.api_key}"
-            urls.append(endpoint)
+                missing.append(ticker)
 
-        async with httpx.AsyncClient() as client:
-            tasks = []
-            for url in urls:
-                tasks.append(asyncio.create_task(self.get_data(client, url)))
-            results = await asyncio.gather(*tasks)
+        # One request per chunk of symbols instead of one per symbol
+        size = get_settings().bulk_chunk_size
+        chunks = [missing[i : i + size] for i in range(0, len(missing), size)]
+        responses = await asyncio.gather(
+            *(
+                self.get_data(client, self.build_url(metric, ",".join(chunk)))
+                for chunk in chunks
+            )
+        )
+
+        # Split the array response back out per symbol
+        requested = set(missing)
+        for data in responses:
+            if not isinstance(data, list):
+                continue
+            for row in data:
+                symbol = str(row.get("symbol", "")).upper()
+                if symbol in requested:
+                    results.setdefault(symbol, []).append(row)
+
+        # Seed the per-ticker cache so single-ticker fetches are served from it
+        for ticker in missing:
+            cache_response(metric, ticker, results.get(ticker))
+        return results
+
+    async def fetch_data(
+        self,
+        ticker: str,
+        metric_types: list[str] | None = None,
+        refresh: bool = False,
+        prefetched: dict[str, Any] | None = None,
+    ) -> StockData | None:
+        """Extracts data asynchronously from multiple FMP endpoints, using any
+        responses already prefetched for the ticker, keyed by metric type"""
+        # Reuse pooled connections instead of opening a client per ticker
+        client = self.http_client or get_http_client()
+        prefetched = prefetched or {}
+
+        async def get(metric: str) -> Any | None:
+            if metric in prefetched:
+                return prefetched[metric]
+            return await self.get_metric(client, metric, ticker, refresh)
+
+        tasks = []
+        for metric in metric_types or self.metric_types:
+            tasks.append(asyncio.create_task(get(metric)))
+        results = await asyncio.gather(*tasks)
 
         # Check if results are empty or contain error messages
         if isinstance(results[0], list) and len(results[0]) == 0:
@@ -79,3 +539,39 @@ class FMPClient:
             return None
         else:
             return results
+
+    async def fetch_many(
+        self, tickers: Iterable[str], concurrency: int | None = None
+    ) -> AsyncIterator[tuple[str, StockData | None]]:
+        """Fetches many tickers concurrently, yielding each one as soon as it finishes"""
+        tickers = list(dict.fromkeys(tickers))
+        semaphore = asyncio.Semaphore(concurrency or get_settings().fetch_concurrency)
+
+        # Prefetch bulk-capable endpoints in batches and hand each ticker its rows
+        # directly; the response cache can't hold a large universe until it's read
+        bulk: dict[str, dict[str, list[dict[str, Any]]]] = {}
+        if len(tickers) > 1:
+            client = self.http_client or get_http_client()
+            metrics = [metric for metric in BULK_METRICS if metric in self.metric_types]
+            responses = await asyncio.gather(
+                *(self.fetch_bulk(client, metric, tickers) for metric in metrics)
+            )
+            bulk = dict(zip(metrics, responses))
+
+        async def fetch_one(ticker: str) -> tuple[str, StockData | None]:
+            prefetched = {
+                metric: rows[ticker.upper()]
+                for metric, rows in bulk.items()
+                if ticker.upper() in rows
+            }
+            async with semaphore:
+                return ticker, await self.fetch_data(ticker, prefetched=prefetched)
+
+        tasks = [asyncio.create_task(fetch_one(ticker)) for ticker in tickers]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            # Stop outstanding fetches if the consumer stops early
+            for task in tasks:
+                task.cancel()
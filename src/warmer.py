@@ -0,0 +1,257 @@
+# warmer.py
+
+import asyncio
+import math
+import sqlite3
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from functools import cache
+from typing import Any
+from zoneinfo import ZoneInfo
+
+import httpx
+
+import data_validation
+import utils
+from config import get_settings
+from data_validation import (
+    METRIC_SECTIONS,
+    DataValidationError,
+    aget_validated_stock_data,
+    inflight_sections,
+    section_records,
+    validate_section,
+    validate_stock_section,
+)
+from utils import (
+    ANNUAL_METRICS,
+    BULK_METRICS,
+    CallBudget,
+    FMPClient,
+    charged_to,
+    get_event_loop,
+    run_sync,
+    stock_logger,
+)
+
+# Upstream calls per ticker for a full warm, on top of the bulk requests
+CALLS_PER_TICKER = len(METRIC_SECTIONS) - len(BULK_METRICS)
+
+
+def market_now() -> datetime:
+    """Returns the current time in the market's time zone"""
+    return datetime.now(ZoneInfo(get_settings().market_timezone))
+
+
+def market_today() -> date:
+    """Returns the current date in the market's time zone"""
+    return market_now().date()
+
+
+@cache
+def get_call_budget() -> CallBudget:
+    """Returns the daily budget shared by every background job in the process"""
+    return CallBudget(get_settings().warm_daily_call_budget, clock=market_today)
+
+
+@dataclass
+class Warmer:
+    """Keeps a watchlist warm: before the open, during trading hours and overnight."""
+
+    tickers: list[str]
+    budget: CallBudget
+    clock: Callable[[], datetime] = market_now
+    client: FMPClient = field(default_factory=FMPClient)
+    warmed_on: date | None = None
+    annual_refreshed_on: date | None = None
+    quotes_polled_at: datetime | None = None
+    # A sidecar also stores polled quotes for the app processes sharing its store
+    store_quotes: bool = False
+
+    def due(self, now: datetime) -> list[str]:
+        """Returns the jobs due at a market-local time"""
+        settings = get_settings()
+        trading_day = now.weekday() < 5
+        open_at = datetime.combine(now.date(), settings.market_open, now.tzinfo)
+        close_at = datetime.combine(now.date(), settings.market_close, now.tzinfo)
+        premarket_at = open_at - timedelta(minutes=settings.warm_premarket_minutes)
+        annual_at = datetime.combine(now.date(), settings.warm_annual_at, now.tzinfo)
+
+        jobs = []
+        # Warm everything on start, then again before each open
+        if self.warmed_on is None or (
+            trading_day and self.warmed_on != now.date() and now >= premarket_at
+        ):
+            jobs.append("warm")
+        # Refresh annual histories overnight, before the pre-market warm
+        if annual_at <= now < premarket_at and self.annual_refreshed_on != now.date():
+            jobs.append("annual")
+        # Re-poll quotes while the market is open
+        if (
+            trading_day
+            and open_at <= now < close_at
+            and (
+                self.quotes_polled_at is None
+                or (now - self.quotes_polled_at).total_seconds()
+                >= settings.warm_quote_interval
+            )
+        ):
+            jobs.append("quotes")
+        return jobs
+
+    def affordable(self, calls_per_ticker: int, fixed: int) -> list[str]:
+        """Returns as many watchlist tickers as the remaining budget should cover,
+        in order; the requests actually made are charged as they go out"""
+        count = min(
+            len(self.tickers),
+            max(0, self.budget.remaining() - fixed) // max(calls_per_ticker, 1),
+        )
+        if not count:
+            stock_logger().warning("Call budget exhausted, skipped warming")
+        elif count < len(self.tickers):
+            stock_logger().warning(
+                f"Call budget only covers {count} of {len(self.tickers)} tickers"
+            )
+        return self.tickers[:count]
+
+    def bulk_calls(self, tickers: list[str]) -> int:
+        """Returns the requests needed for one bulk metric over tickers"""
+        return math.ceil(len(tickers) / get_settings().bulk_chunk_size)
+
+    async def warm_all(self) -> None:
+        """Fetches, validates and stores every section for the watchlist"""
+        fixed = len(BULK_METRICS) * self.bulk_calls(self.tickers)
+        tickers = self.affordable(CALLS_PER_TICKER, fixed)
+        if not tickers:
+            return
+
+        client = self.client.http_client or utils.get_http_client()
+        semaphore = asyncio.Semaphore(get_settings().fetch_concurrency)
+
+        async def warm(ticker: str) -> None:
+            async with semaphore:
+                await aget_validated_stock_data(ticker)
+
+        with charged_to(self.budget):
+            await asyncio.gather(
+                *(
+                    self.client.fetch_bulk(client, metric, tickers)
+                    for metric in BULK_METRICS
+                )
+            )
+            await asyncio.gather(
+                *(warm(ticker) for ticker in tickers), return_exceptions=True
+            )
+
+    async def poll_quotes(self) -> None:
+        """Refreshes the cached quotes of the watchlist with bulk requests"""
+        if self.budget.remaining() < self.bulk_calls(self.tickers):
+            stock_logger().warning("Call budget exhausted, skipped quote poll")
+            return
+        # Replace the cached quotes in place, keeping any that fail to refresh
+        client = self.client.http_client or utils.get_http_client()
+        with charged_to(self.budget):
+            quotes = await self.client.fetch_bulk(
+                client, "quote", self.tickers, refresh=True
+            )
+        if self.store_quotes and get_settings().snapshot_enabled:
+            await asyncio.to_thread(self.save_quotes, quotes)
+
+    def save_quotes(self, quotes: dict[str, list[dict[str, Any]]]) -> None:
+        """Validates polled quotes into the snapshot store"""
+        for ticker, rows in quotes.items():
+            try:
+                validated = validate_section("quote", rows)
+            except DataValidationError as e:
+                stock_logger().warning(f"Skipped invalid quote for {ticker}: {e}")
+                continue
+            data_validation.get_snapshot_store().save(
+                ticker, {"quote": section_records(validated)}
+            )
+
+    async def refresh_annual(self) -> None:
+        """Re-fetches annual histories, ignoring their cache TTL"""
+        sections = [METRIC_SECTIONS[metric] for metric in ANNUAL_METRICS]
+        tickers = self.affordable(len(sections), 0)
+        semaphore = asyncio.Semaphore(get_settings().fetch_concurrency)
+
+        async def refresh(ticker: str, section: str) -> None:
+            async with semaphore:
+                # Shared with any session loading the same section meanwhile
+                await inflight_sections.do(
+                    (ticker.upper(), section),
+                    lambda: validate_stock_section(ticker, section, refresh=True),
+                )
+
+        with charged_to(self.budget):
+            await asyncio.gather(
+                *(
+                    refresh(ticker, section)
+                    for ticker in tickers
+                    for section in sections
+                ),
+                return_exceptions=True,
+            )
+
+    async def run_due(self) -> list[str]:
+        """Runs the jobs that are due now and returns their names"""
+        now = self.clock()
+        jobs = self.due(now)
+        if "annual" in jobs:
+            await self.refresh_annual()
+            self.annual_refreshed_on = now.date()
+        if "warm" in jobs:
+            await self.warm_all()
+            self.warmed_on = now.date()
+        if "quotes" in jobs:
+            await self.poll_quotes()
+            self.quotes_polled_at = now
+        return jobs
+
+    async def run_forever(self) -> None:
+        """Checks for due jobs until cancelled"""
+        while True:
+            try:
+                await self.run_due()
+            except (
+                httpx.HTTPError,
+                DataValidationError,
+                OSError,
+                sqlite3.Error,
+            ) as e:
+                stock_logger().error(f"Cache warming failed: {e}")
+            await asyncio.sleep(min(get_settings().warm_quote_interval, 60.0))
+
+
+_job: Future | None = None
+_job_lock = threading.Lock()
+
+
+def start_warmer() -> None:
+    """Starts warming the watchlist on the background loop, once per process"""
+    global _job
+    settings = get_settings()
+    if not settings.watchlist:
+        return
+    with _job_lock:
+        if _job is None:
+            warmer = Warmer(
+                tickers=[ticker.upper() for ticker in settings.watchlist],
+                budget=get_call_budget(),
+            )
+            _job = asyncio.run_coroutine_threadsafe(
+                warmer.run_forever(), get_event_loop()
+            )
+
+
+if __name__ == "__main__":
+    # Run as a sidecar; the app then warm-starts from the shared snapshot store
+    warmer = Warmer(
+        tickers=[ticker.upper() for ticker in get_settings().watchlist],
+        budget=get_call_budget(),
+        store_quotes=True,
+    )
+    run_sync(warmer.run_forever())
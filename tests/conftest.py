@@ -0,0 +1,89 @@
+import copy
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+
+import data_validation
+import utils
+from config import settings
+from store import SnapshotStore
+from utils import CircuitBreaker, RateLimiter, get_response_cache
+
+FIXTURES = Path(__file__).parent / "fixtures" / "fmp"
+
+# Symbol the fixture handler answers with an empty list, like FMP does
+UNKNOWN_TICKER = "UNKNOWN"
+
+
+def load_fixture(metric: str) -> list[dict]:
+    """Loads a recorded FMP response for a metric type"""
+    return json.loads((FIXTURES / f"{metric}.json").read_text())
+
+
+def fmp_handler(request: httpx.Request) -> httpx.Response:
+    """Replays recorded FMP responses, relabelled for the requested symbols"""
+    *_, metric, symbols = request.url.path.split("/")
+    symbols = [s for s in symbols.split(",") if s.upper() != UNKNOWN_TICKER]
+    if not (FIXTURES / f"{metric}.json").exists():
+        return httpx.Response(404, json={"Error Message": f"Unknown endpoint {metric}"})
+
+    recorded = load_fixture(metric)
+    if isinstance(recorded, dict):
+        # Price history: one symbol with its bars under "historical"
+        if not symbols:
+            return httpx.Response(200, json={})
+        since = request.url.params.get("from", "")
+        bars = [bar for bar in recorded["historical"] if bar["date"] >= since]
+        return httpx.Response(200, json={"symbol": symbols[0], "historical": bars})
+
+    rows = []
+    for symbol in symbols:
+        for row in copy.deepcopy(recorded):
+            if "symbol" in row:
+                row["symbol"] = symbol.upper()
+            rows.append(row)
+
+    limit = request.url.params.get("limit")
+    if limit is not None:
+        rows = rows[: int(limit)]
+    return httpx.Response(200, json=rows)
+
+
+@pytest.fixture(autouse=True)
+def circuit_breaker(monkeypatch):
+    """Gives every test a closed circuit breaker"""
+    breaker = CircuitBreaker()
+    monkeypatch.setattr(utils, "get_circuit_breaker", lambda: breaker)
+    return breaker
+
+
+@pytest.fixture
+def fmp_calls(monkeypatch):
+    """Routes FMP traffic to recorded fixtures and returns the requested URLs"""
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(str(request.url))
+        return fmp_handler(request)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(utils, "get_http_client", lambda: client)
+    limiter = RateLimiter(60_000, burst=1_000)
+    monkeypatch.setattr(utils, "get_rate_limiter", lambda: limiter)
+    monkeypatch.setattr(settings, "snapshot_enabled", False)
+    get_response_cache().clear()
+    yield calls
+    get_response_cache().clear()
+
+
+@pytest.fixture
+def snapshot_store(monkeypatch, tmp_path):
+    """Enables snapshots and gives the test its own store; request it after
+    fmp_calls, which turns snapshots off"""
+    monkeypatch.setattr(settings, "snapshot_enabled", True)
+    store = SnapshotStore(str(tmp_path / "db.sqlite"))
+    monkeypatch.setattr(data_validation, "get_snapshot_store", lambda: store)
+    yield store
+    store.close()
@@ -0,0 +1,95 @@
+import polars as pl
+import pytest
+
+from analytics import (
+    cagr,
+    compute_analytics,
+    load_universe,
+    run_analytics,
+    sector_percentiles,
+    ttm_zscores,
+)
+from config import settings
+from data_validation import get_validated_stock_data
+
+
+@pytest.fixture
+def stored_universe(fmp_calls, snapshot_store, monkeypatch, tmp_path):
+    """Stores validated data for a few tickers, as after analyzing them"""
+    monkeypatch.setattr(settings, "analytics_path", str(tmp_path / "analytics.parquet"))
+    for ticker in ("AAPL", "MSFT", "NVDA"):
+        get_validated_stock_data(ticker)
+    return snapshot_store
+
+
+def test_cagr_compounds_each_ticker_separately():
+    """Test CAGR looks back years rows within each ticker and skips negatives"""
+    df = pl.DataFrame(
+        {
+            "symbol": ["A", "A", "A", "B", "B", "B"],
+            "v": [100.0, 110.0, 121.0, -5.0, 1.0, 2.0],
+        }
+    ).with_columns(cagr("v", 2))
+
+    assert df["v_cagr_2y"].round(6).to_list() == [None, None, 0.1, None, None, None]
+
+
+def test_ttm_zscores_against_own_history():
+    """Test TTM values are scored against their own ticker's annual values"""
+    history = pl.DataFrame(
+        {"symbol": ["A", "A", "B", "B"], "pe_ratio": [10.0, 20.0, 30.0, 30.0]}
+    )
+    ttm = pl.DataFrame({"symbol": ["A", "B"], "pe_ratio_ttm": [22.0, 40.0]})
+
+    df = ttm_zscores(ttm, history, {"pe_ratio": "pe_ratio_ttm"})
+
+    assert df.columns == ["symbol", "pe_ratio_ttm", "pe_ratio_ttm_z"]
+    assert round(df["pe_ratio_ttm_z"][0], 4) == round(7 / 50**0.5, 4)
+    assert df["pe_ratio_ttm_z"][1] is None
+
+
+def test_sector_percentiles_rank_within_sector():
+    """Test percentiles are relative to the ticker's sector and ignore nulls"""
+    df = pl.DataFrame(
+        {
+            "sector": ["Tech", "Tech", "Tech", "Energy", "Tech"],
+            "pe": [10.0, 30.0, 20.0, 99.0, None],
+        }
+    ).pipe(sector_percentiles, ["pe"])
+
+    assert df["pe_pct"].to_list() == [33.3, 100.0, 66.7, 100.0, None]
+
+
+def test_load_universe_reads_every_stored_ticker(stored_universe):
+    """Test the latest stored sections of all tickers load as one frame each"""
+    sections = load_universe(stored_universe)
+
+    assert sections["key_metrics_ttm"]["symbol"].to_list() == ["AAPL", "MSFT", "NVDA"]
+    assert sections["key_metrics"]["symbol"].n_unique() == 3
+    assert sections["profile"]["sector"][0] == "Technology"
+
+
+def test_compute_analytics_one_row_per_ticker(stored_universe):
+    """Test the batch adds CAGRs, z-scores and percentiles for every ticker"""
+    df = compute_analytics(load_universe(stored_universe), years=5)
+
+    assert df["symbol"].to_list() == ["AAPL", "MSFT", "NVDA"]
+    assert {
+        "sector",
+        "rev_per_share_cagr_5y",
+        "pe_ratio_ttm_z",
+        "pe_ratio_ttm_pct",
+        "fiveY_rev_growth_per_share",
+    } <= set(df.columns)
+    assert df["rev_per_share_cagr_5y"].null_count() == 0
+    # Identical histories rank as ties across the sector
+    assert df["pe_ratio_ttm_pct"].unique().to_list() == [66.7]
+
+
+def test_run_analytics_writes_parquet(stored_universe, fmp_calls):
+    """Test the batch runs from stored data alone and writes its results"""
+    fmp_calls.clear()
+    path = run_analytics(stored_universe)
+
+    assert pl.read_parquet(path).height == 3
+    assert fmp_calls == []
@@ -0,0 +1,46 @@
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from config import settings
+from data_validation import get_validated_stock_data
+
+
+def render_tables(data):
+    """Renders the metric tables for validated sections"""
+    from app import display_metric_tables
+
+    display_metric_tables(
+        [
+            data["quote"][0],
+            data["key_metrics_ttm"][0],
+            data["growth"],
+            data["ratings"],
+        ]
+    )
+
+
+@pytest.mark.parametrize("columnar", [True, False])
+def test_metric_tables_render_in_both_modes(fmp_calls, monkeypatch, columnar):
+    """Test the tables render from growth frames and from growth rows alike"""
+    monkeypatch.setattr(settings, "columnar_min_rows", 0 if columnar else 1_000_000)
+    data = get_validated_stock_data("AAPL")
+
+    at = AppTest.from_function(render_tables, args=(data,)).run()
+
+    assert not at.exception
+
+
+def test_invalid_section_loads_as_missing(monkeypatch):
+    """Test a section that fails validation is shown as missing"""
+    import data_validation
+    from app import load_section
+
+    def invalid(ticker, section):
+        raise data_validation.DataValidationError(f"{section} is invalid")
+
+    monkeypatch.setattr(data_validation, "get_validated_section", invalid)
+    load_section.clear()
+
+    records, _ = load_section("AAPL", "growth")
+
+    assert records is None
@@ -0,0 +1,84 @@
+import asyncio
+
+from cache import SingleFlight, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+    def test_hit_and_miss(self):
+        """Test hit/miss counters"""
+        cache = TTLCache(max_entries=10)
+        assert cache.get("quote") is None
+        cache.set("quote", [{"price": 1.0}], ttl=60)
+        assert cache.get("quote") == [{"price": 1.0}]
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_entries_expire(self):
+        """Test entries are dropped once their TTL has passed"""
+        clock = FakeClock()
+        cache = TTLCache(max_entries=10, clock=clock)
+        cache.set("quote", 1, ttl=15)
+        cache.set("key-metrics", 2, ttl=86_400)
+
+        clock.now = 20
+        assert cache.get("quote") is None
+        assert cache.get("key-metrics") == 2
+        assert len(cache) == 1
+
+    def test_lru_eviction(self):
+        """Test least recently used entry is evicted when full"""
+        cache = TTLCache(max_entries=2)
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        cache.get("a")
+        cache.set("c", 3, ttl=60)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_stale_entries_within_window(self):
+        """Test expired entries are still served by get_stale within stale_ttl"""
+        clock = FakeClock()
+        cache = TTLCache(max_entries=10, stale_ttl=60, clock=clock)
+        cache.set("quote", 1, ttl=15)
+
+        clock.now = 30
+        assert cache.get("quote") is None
+        assert cache.get_stale("quote") == 1
+
+        clock.now = 80
+        assert cache.get_stale("quote") is None
+
+
+class TestSingleFlight:
+    def test_concurrent_callers_share_one_call(self):
+        """Test callers with the same key share one in-flight call"""
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return [{"price": 1.0}]
+
+        async def run():
+            return await asyncio.gather(
+                *(flight.do(("quote", "AAPL"), fetch) for _ in range(5)),
+                flight.do(("quote", "MSFT"), fetch),
+            )
+
+        results = asyncio.run(run())
+        assert len(calls) == 2
+        assert results[0] is results[4]
+        assert flight.shared == 4
+        assert len(flight) == 0
@@ -0,0 +1,63 @@
+from datetime import date
+
+import plotly.io as pio
+import polars as pl
+
+from charts import (
+    TEMPLATE_NAME,
+    create_compare_chart,
+    create_metrics_bar_chart,
+    create_price_chart,
+)
+
+HISTORY = pl.DataFrame(
+    {
+        "Year": [date(2023, 9, 30), date(2024, 9, 28)],
+        "pe_ratio": [29.5, 37.3],
+    }
+)
+
+
+def test_template_is_registered():
+    """Test the shared chart template is available to plotly"""
+    assert TEMPLATE_NAME in pio.templates
+    assert pio.templates[TEMPLATE_NAME].layout.height == 450
+
+
+def test_metrics_chart_marks_ttm_value():
+    """Test the metrics chart adds the TTM marker and reference line"""
+    fig = create_metrics_bar_chart(HISTORY, "Year", "pe_ratio", "PE Ratio", 35.1)
+
+    assert [trace.name for trace in fig.data] == ["Historical", "TTM"]
+    assert fig.layout.shapes[0].y0 == 35.1
+    assert list(fig.layout.xaxis.ticktext) == ["2023", "2024"]
+
+
+def test_price_chart_draws_one_line():
+    """Test the price chart is a single line over dates"""
+    prices = pl.DataFrame(
+        {"date": [date(2024, 12, 19), date(2024, 12, 20)], "close": [249.79, 254.49]}
+    )
+    fig = create_price_chart(prices, "date", "close", "Daily Close")
+
+    assert len(fig.data) == 1 and fig.data[0].mode == "lines"
+    assert list(fig.data[0].y) == [249.79, 254.49]
+    assert fig.layout.xaxis.tickmode == "auto"
+
+
+def test_compare_chart_has_a_trace_per_symbol():
+    """Test one long frame becomes grouped bars or lines, one trace per symbol"""
+    peers = pl.DataFrame(
+        {
+            "symbol": ["AAPL", "AAPL", "MSFT", "MSFT"],
+            "FY": [2023, 2024, 2023, 2024],
+            "pe_ratio": [29.5, 37.3, 35.0, 36.1],
+        }
+    )
+    bars = create_compare_chart(peers, "FY", "pe_ratio", "PE Ratio")
+    lines = create_compare_chart(peers, "FY", "pe_ratio", "PE Ratio", kind="line")
+
+    assert [trace.name for trace in bars.data] == ["AAPL", "MSFT"]
+    assert bars.layout.barmode == "group"
+    assert list(bars.data[1].y) == [35.0, 36.1]
+    assert all(trace.type == "scatter" for trace in lines.data)
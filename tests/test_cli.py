@@ -0,0 +1,85 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import httpx
+import polars as pl
+
+import utils
+from cli import main, read_tickers
+from config import settings
+
+SRC = Path(__file__).parents[1] / "src"
+
+
+def test_read_tickers_merges_arguments_and_file(tmp_path):
+    """Test tickers are read from arguments and a file, deduplicated"""
+    tickers_file = tmp_path / "tickers.txt"
+    tickers_file.write_text("msft, nvda\naapl\n")
+
+    assert read_tickers(["aapl"], str(tickers_file)) == ["AAPL", "MSFT", "NVDA"]
+
+
+def test_export_parquet_stacks_tickers(fmp_calls, tmp_path):
+    """Test every section is exported to one Parquet file for all tickers"""
+    assert main(["AAPL", "MSFT", "-o", str(tmp_path)]) == 0
+
+    quote = pl.read_parquet(tmp_path / "quote.parquet")
+    growth = pl.read_parquet(tmp_path / "growth.parquet")
+    assert sorted(quote["symbol"]) == ["AAPL", "MSFT"]
+    assert growth.height == 20
+    assert len(list(tmp_path.iterdir())) == 6
+
+
+def test_export_csv_and_ndjson_for_selected_metrics(fmp_calls, tmp_path):
+    """Test only the selected metric types are exported in text formats"""
+    main(["AAPL", "-o", str(tmp_path / "csv"), "--format", "csv", "--metrics", "quote"])
+    main(
+        [
+            "AAPL",
+            "-o",
+            str(tmp_path / "nd"),
+            "--format",
+            "ndjson",
+            "--metrics",
+            "rating",
+        ]
+    )
+
+    assert pl.read_csv(tmp_path / "csv" / "quote.csv")["price"][0] == 227.52
+    [line] = (tmp_path / "nd" / "ratings.ndjson").read_text().splitlines()
+    assert json.loads(line)["rating"] == "S-"
+
+
+def test_unknown_tickers_fail(fmp_calls, tmp_path):
+    """Test the command fails when no ticker returns data"""
+    assert main(["UNKNOWN", "-o", str(tmp_path)]) == 1
+    assert main([]) == 2
+
+
+def test_failed_requests_fail(fmp_calls, monkeypatch, tmp_path):
+    """Test the command fails and writes nothing when every request fails"""
+    client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(503))
+    )
+    monkeypatch.setattr(utils, "get_http_client", lambda: client)
+    monkeypatch.setattr(settings, "retry_attempts", 0)
+
+    assert main(["AAPL", "MSFT", "-o", str(tmp_path)]) == 1
+    assert not list(tmp_path.iterdir())
+
+
+def test_cli_does_not_import_ui_libraries():
+    """Test the CLI stays free of streamlit and plotly imports"""
+    code = "import sys, cli; print(sorted({'streamlit', 'plotly'} & set(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=SRC,
+        env={**os.environ, "FMP_API_KEY": "x"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,46 @@
+import asyncio
+
+import polars as pl
+
+from compare import compare_history, fetch_histories, get_histories
+from tests.conftest import load_fixture
+
+
+def test_fetch_histories_stacks_tickers(fmp_calls):
+    """Test each ticker's annual histories are fetched once and stacked by symbol"""
+    stacked, failed = asyncio.run(fetch_histories(["AAPL", "MSFT", "UNKNOWN"]))
+
+    assert failed == ["UNKNOWN"]
+    assert len(fmp_calls) == 6
+    assert stacked["key_metrics"]["symbol"].unique().sort().to_list() == [
+        "AAPL",
+        "MSFT",
+    ]
+    assert stacked["growth"].height == 2 * len(load_fixture("financial-growth"))
+
+
+def test_compare_history_is_keyed_by_fiscal_year(fmp_calls):
+    """Test histories are sorted per symbol with a fiscal year column"""
+    histories, _ = get_histories(["MSFT", "AAPL"])
+    growth = histories["growth"]
+
+    assert growth.columns[-1] == "FY"
+    assert growth.filter(pl.col("symbol") == "AAPL")["FY"].is_sorted()
+    latest = growth.filter(pl.col("symbol") == "AAPL", pl.col("FY") == 2024)
+    assert latest["rev_growth"][0] == round(
+        load_fixture("financial-growth")[0]["revenueGrowth"] * 100, 2
+    )
+
+
+def test_compare_history_keeps_one_row_per_year():
+    """Test a fiscal year reported twice keeps its latest report"""
+    frame = pl.DataFrame(
+        {
+            "symbol": ["X", "X"],
+            "date": ["2023-01-31", "2023-12-31"],
+            "pe_ratio": [10.0, 12.0],
+        }
+    )
+    df = compare_history("key_metrics", frame)
+
+    assert df.to_dicts() == [{"symbol": "X", "pe_ratio": 12.0, "FY": 2023}]
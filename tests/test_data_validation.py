@@ -1,8 +1,32 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import polars as pl
+import pytest
+
+import data_validation
+import utils
+from config import settings
+from data_validation import (
+    SECTION_METRICS,
+    aget_validated_section,
+    aget_validated_stock_data,
+    get_validated_section,
+    merge_history,
+    prefetch_sections,
+    section_frame,
+)
 from src.data_validation import get_validated_stock_data
+from stock_models import QuoteRecord
+from tests.conftest import fmp_handler, load_fixture
+from utils import get_response_cache
 
 
-def test_get_validated_stock_data_valid_ticker():
+def test_get_validated_stock_data_valid_ticker(monkeypatch):
     """Test data validation with valid ticker"""
+    # Fetch from the live API rather than snapshots stored by earlier runs
+    monkeypatch.setattr(settings, "snapshot_enabled", False)
     ticker = "AAPL"
     data = get_validated_stock_data(ticker)
 
@@ -11,3 +35,250 @@ def test_get_validated_stock_data_valid_ticker():
     assert "quote" in data
     assert "ratings" in data
     assert "key_metrics_ttm" in data
+
+
+def test_aget_validated_stock_data_offline(fmp_calls):
+    """Test the async pipeline against recorded FMP responses"""
+    data = asyncio.run(aget_validated_stock_data("AAPL"))
+
+    assert data["quote"][0].price == 227.52
+    assert data["key_metrics"][0]["symbol"] == "AAPL"
+    assert len(data["growth"]) == 10
+    assert len(fmp_calls) == 6
+
+
+def test_get_validated_stock_data_sync_wrapper(fmp_calls):
+    """Test the sync wrapper returns the same payload as the async API"""
+    data = get_validated_stock_data("MSFT")
+
+    assert data["profile"][0].company_name == "Apple Inc."
+    assert data["ratings"][0].symbol == "MSFT"
+
+
+def test_get_validated_stock_data_unknown_ticker(fmp_calls):
+    """Test an unknown ticker returns None"""
+    assert get_validated_stock_data("UNKNOWN") is None
+
+
+def serve_slowly(monkeypatch, calls):
+    """Delays recorded responses so concurrent callers overlap the shared fetch"""
+
+    async def handler(request):
+        calls.append(str(request.url))
+        await asyncio.sleep(0.05)
+        return fmp_handler(request)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(utils, "get_http_client", lambda: client)
+
+
+def test_concurrent_requests_share_fetches(fmp_calls, monkeypatch):
+    """Test concurrent sessions for one ticker share a single set of requests"""
+    serve_slowly(monkeypatch, fmp_calls)
+
+    async def analyze_many():
+        return await asyncio.gather(
+            *(aget_validated_stock_data(t) for t in ["AAPL", "aapl", "AAPL"])
+        )
+
+    results = asyncio.run(analyze_many())
+    assert results[0] is results[1] is results[2]
+    assert len(fmp_calls) == 6
+
+
+def test_callers_on_other_loops_share_the_background_loop(fmp_calls, monkeypatch):
+    """Test sessions awaiting from their own event loops share one fetch"""
+    serve_slowly(monkeypatch, fmp_calls)
+    with ThreadPoolExecutor(3) as pool:
+        results = list(
+            pool.map(lambda _: asyncio.run(aget_validated_stock_data("AAPL")), range(3))
+        )
+
+    assert all(data["quote"][0].price == 227.52 for data in results)
+    assert len(fmp_calls) == 6
+
+
+def test_aget_validated_section_fetches_one_endpoint(fmp_calls):
+    """Test a single section is fetched and validated on its own"""
+    quote = asyncio.run(aget_validated_section("AAPL", "quote"))
+
+    assert quote[0].year_high == 237.49
+    assert len(fmp_calls) == 1
+    assert "/quote/AAPL" in fmp_calls[0]
+
+
+def test_prefetch_sections_fetches_every_endpoint_once(fmp_calls):
+    """Test prefetched sections are shared with the sections loaded afterwards"""
+    prefetch_sections("AAPL")
+    sections = {
+        section: get_validated_section("AAPL", section) for section in SECTION_METRICS
+    }
+
+    assert all(records is not None for records in sections.values())
+    assert len(fmp_calls) == 6
+
+
+def test_bad_section_is_refetched_alone(fmp_calls, monkeypatch):
+    """Test a section failing validation is re-fetched without the others"""
+    bad_responses = iter([[{"symbol": "AAPL", "rating": None}]])
+
+    def handler(request):
+        fmp_calls.append(str(request.url))
+        if "/rating/" in request.url.path:
+            bad = next(bad_responses, None)
+            if bad is not None:
+                return httpx.Response(200, json=bad)
+        return fmp_handler(request)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(utils, "get_http_client", lambda: client)
+    data = get_validated_stock_data("AAPL")
+
+    assert data["ratings"][0].rating == "S-"
+    assert len(fmp_calls) == 7
+    assert sum("/rating/" in url for url in fmp_calls) == 2
+
+
+def test_persistently_bad_section_is_marked_missing(fmp_calls, monkeypatch):
+    """Test a section that keeps failing is None while the others are kept"""
+
+    def handler(request):
+        fmp_calls.append(str(request.url))
+        if "/rating/" in request.url.path:
+            return httpx.Response(200, json=[{"symbol": "AAPL"}])
+        return fmp_handler(request)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(utils, "get_http_client", lambda: client)
+    data = get_validated_stock_data("AAPL")
+
+    assert data["ratings"] is None
+    assert data["quote"][0].price == 227.52
+    assert len(data["growth"]) == 10
+
+
+def test_annual_sections_are_validated_into_frames(fmp_calls, monkeypatch):
+    """Test long key_metrics and growth histories come back as typed polars frames"""
+    monkeypatch.setattr(settings, "columnar_min_rows", 10)
+    data = get_validated_stock_data("AAPL")
+
+    assert isinstance(data["key_metrics"], pl.DataFrame)
+    assert data["key_metrics"].schema["pe_ratio"] == pl.Float64
+    assert data["growth"]["fcf_growth"].null_count() == 1
+    assert isinstance(data["ratings"], list)
+
+
+@pytest.mark.parametrize(
+    "setting, value", [("columnar_validation", False), ("columnar_min_rows", 11)]
+)
+def test_row_mode_is_kept_without_columnar_validation(
+    fmp_calls, monkeypatch, setting, value
+):
+    """Test disabling columnar validation, or a history shorter than the columnar
+    minimum, returns model dumps for every section"""
+    monkeypatch.setattr(settings, setting, value)
+    data = get_validated_stock_data("AAPL")
+
+    assert data["key_metrics"][0]["symbol"] == "AAPL"
+    assert len(data["growth"]) == 10
+
+
+def test_stored_sections_load_as_records(fmp_calls, snapshot_store):
+    """Test single-record sections come back from the store as records"""
+    fetched = get_validated_section("AAPL", "quote")
+    get_response_cache().clear()
+
+    stored = get_validated_section("AAPL", "quote")
+
+    assert isinstance(stored[0], QuoteRecord)
+    assert stored == fetched
+    assert len(fmp_calls) == 1
+
+
+def test_page_load_reads_each_stored_section_once(
+    fmp_calls, snapshot_store, monkeypatch
+):
+    """Test validating every section reads only its own stored copy, once"""
+    data_validation.get_validated_stock_data("AAPL")
+    monkeypatch.setitem(settings.cache_ttls, "key-metrics", 0.0)
+    get_response_cache().clear()
+    reads = []
+    load_section = snapshot_store.load_section
+    monkeypatch.setattr(
+        snapshot_store,
+        "load_section",
+        lambda *args: reads.append(args) or load_section(*args),
+    )
+
+    data_validation.get_validated_stock_data("AAPL")
+
+    assert sorted(section for _, section in reads) == sorted(SECTION_METRICS)
+
+
+@pytest.fixture
+def stored_history(fmp_calls, snapshot_store, monkeypatch):
+    """Stores a full key_metrics history that is past its cache TTL"""
+    get_validated_section("AAPL", "key_metrics")
+    monkeypatch.setitem(settings.cache_ttls, "key-metrics", 0.0)
+    get_response_cache().clear()
+    fmp_calls.clear()
+    return fmp_calls
+
+
+def serve_latest(monkeypatch, calls, rows):
+    """Answers limited key-metrics requests with the given rows"""
+
+    def handler(request):
+        calls.append(str(request.url))
+        if "limit" in request.url.params:
+            return httpx.Response(200, json=rows)
+        return fmp_handler(request)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(utils, "get_http_client", lambda: client)
+
+
+def test_incremental_refresh_fetches_latest_periods(stored_history):
+    """Test a stored annual history is refreshed with a limited request"""
+    df = section_frame(get_validated_section("AAPL", "key_metrics"))
+
+    assert df.height == 10
+    assert len(stored_history) == 1
+    assert "limit=2" in stored_history[0]
+
+
+def test_incremental_refresh_adds_new_year(stored_history, monkeypatch):
+    """Test a new fiscal year is merged on top of the stored history"""
+    recorded = load_fixture("key-metrics")
+    new_year = {**recorded[0], "date": "2025-09-27", "peRatio": 40.0}
+    latest = {**recorded[0], "peRatio": 38.0}
+    serve_latest(monkeypatch, stored_history, [new_year, latest])
+
+    df = section_frame(get_validated_section("AAPL", "key_metrics"))
+
+    assert df["date"].to_list()[:2] == ["2025-09-27", "2024-09-28"]
+    assert df["pe_ratio"].to_list()[:2] == [40.0, 38.0]
+    assert df.height == 11
+    assert len(stored_history) == 1
+
+
+def test_restatement_refetches_full_history(stored_history, monkeypatch):
+    """Test a changed older year triggers a full history download"""
+    recorded = load_fixture("key-metrics")
+    restated = {**recorded[1], "peRatio": 1.0}
+    serve_latest(monkeypatch, stored_history, [recorded[0], restated])
+
+    df = section_frame(get_validated_section("AAPL", "key_metrics"))
+
+    assert df.height == 10
+    assert df["pe_ratio"][1] == recorded[1]["peRatio"]
+    assert len(stored_history) == 2
+    assert "limit" not in stored_history[1]
+
+
+def test_merge_history_needs_overlap():
+    """Test latest rows that don't overlap the stored history aren't merged"""
+    stored = [{"date": "2023-09-30", "v": 1}, {"date": "2022-09-24", "v": 2}]
+
+    assert merge_history(stored, [{"date": "2025-09-27", "v": 3}]) is None
+    assert merge_history(stored, [{"date": "2023-09-30", "v": 4}])[0]["v"] == 4
@@ -0,0 +1,79 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parents[1] / "src"
+
+# Import time app.py may add on top of streamlit itself, as a share of
+# streamlit's import time in the same run; it adds about 0.3 today
+APP_IMPORT_RATIO = 0.6
+
+# Libraries the landing page must not load before a ticker is analyzed
+DEFERRED_MODULES = (
+    "polars",
+    "httpx",
+    "data_validation",
+    "utils",
+    "charts",
+    "prices",
+    "compare",
+)
+
+
+def run_python(code: str, *flags: str, env: dict | None = None):
+    """Runs a snippet in a fresh interpreter from the src directory"""
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=SRC,
+        env=env or {**os.environ, "FMP_API_KEY": "x"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_settings_are_read_on_first_use():
+    """Test importing config doesn't read the environment"""
+    env = {k: v for k, v in os.environ.items() if k != "FMP_API_KEY"}
+    code = "import config\ntry:\n    config.settings\nexcept Exception as e:\n    print(type(e).__name__)"
+    result = run_python(code, env=env)
+
+    assert result.stdout.strip() == "ValidationError"
+
+
+def test_modules_import_without_api_key():
+    """Test no module reads the settings at import, so --help works without a key"""
+    env = {k: v for k, v in os.environ.items() if k != "FMP_API_KEY"}
+    code = "import app, analytics, screener, warmer, cli\ncli.parse_args(['--help'])"
+    result = run_python(code, env=env)
+
+    assert "--concurrency" in result.stdout
+
+
+def test_app_import_defers_data_libraries():
+    """Test importing the app doesn't load the data and charting stack"""
+    code = (
+        f"import sys, app; print([m for m in {DEFERRED_MODULES!r} if m in sys.modules])"
+    )
+    result = run_python(code)
+
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_app_import_time_budget():
+    """Test app.py adds at most APP_IMPORT_RATIO to streamlit's own import time,
+    measured in the same interpreter so a loaded machine slows both alike"""
+    result = run_python("import app", "-X", "importtime")
+    cumulative = {
+        name: int(us) / 1e6
+        for us, name in re.findall(
+            r"^import time:\s+\d+ \|\s+(\d+) \|\s*(app|streamlit)$",
+            result.stderr,
+            re.MULTILINE,
+        )
+    }
+
+    added = cumulative["app"] - cumulative["streamlit"]
+    assert added < APP_IMPORT_RATIO * cumulative["streamlit"]
@@ -0,0 +1,86 @@
+import asyncio
+import json
+import urllib.request
+
+import pytest
+
+from metrics import (
+    Metrics,
+    get_metrics,
+    start_metrics_server,
+    stop_metrics_server,
+    timed,
+)
+from utils import FMPClient
+
+
+@pytest.fixture
+def enabled_metrics(monkeypatch):
+    """Turns the process-wide metrics on for one test"""
+    metrics = get_metrics()
+    monkeypatch.setattr(metrics, "enabled", True)
+    metrics.reset()
+    yield metrics
+    metrics.reset()
+
+
+def test_disabled_metrics_record_nothing():
+    """Test metrics are off by default and timing is a no-op"""
+    m = Metrics()
+    with m.timed("fetch"):
+        m.inc("calls_total")
+
+    assert m.to_dict() == {"counters": [], "histograms": []}
+
+
+def test_prometheus_export():
+    """Test counters and histograms are exported in Prometheus text format"""
+    m = Metrics(enabled=True)
+    m.inc("fmp_responses_total", endpoint="quote", status=200)
+    m.observe("stage_duration_seconds", 0.02, stage="validate")
+
+    text = m.to_prometheus()
+    assert 'stockdataview_fmp_responses_total{endpoint="quote",status="200"} 1' in text
+    assert (
+        'stockdataview_stage_duration_seconds_bucket{stage="validate",le="0.01"} 0'
+        in text
+    )
+    assert (
+        'stockdataview_stage_duration_seconds_bucket{stage="validate",le="0.025"} 1'
+        in text
+    )
+    assert 'stockdataview_stage_duration_seconds_count{stage="validate"} 1' in text
+
+
+def test_fetch_records_requests_and_cache_hits(fmp_calls, enabled_metrics):
+    """Test FMP latency, status, bytes and cache lookups are recorded"""
+    client = FMPClient()
+    asyncio.run(client.fetch_data("AAPL", ["quote"]))
+    asyncio.run(client.fetch_data("AAPL", ["quote"]))
+
+    counters = {
+        (c["name"], tuple(c["labels"].values())): c["value"]
+        for c in enabled_metrics.to_dict()["counters"]
+    }
+    assert counters[("fmp_responses_total", ("quote", "200"))] == 1
+    assert counters[("fmp_response_bytes_total", ("quote",))] > 0
+    assert counters[("cache_requests_total", ("quote", "miss"))] == 1
+    assert counters[("cache_requests_total", ("quote", "hit"))] == 1
+
+
+def test_metrics_endpoint_serves_json(enabled_metrics):
+    """Test the local endpoint serves recorded stage timings"""
+    with timed("render", section="growth"):
+        pass
+
+    server = start_metrics_server(port=0)
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics.json") as r:
+            data = json.load(r)
+    finally:
+        stop_metrics_server()
+
+    [histogram] = data["histograms"]
+    assert histogram["labels"] == {"section": "growth", "stage": "render"}
+    assert histogram["count"] == 1
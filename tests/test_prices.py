@@ -0,0 +1,112 @@
+import asyncio
+import os
+from datetime import date
+
+import httpx
+import polars as pl
+import pytest
+
+import utils
+from config import settings
+from prices import (
+    append_prices,
+    price_frame,
+    scan_prices,
+    update_prices,
+)
+from tests.conftest import fmp_handler, load_fixture
+
+
+@pytest.fixture
+def price_dir(fmp_calls, monkeypatch, tmp_path):
+    """Stores prices in a temporary directory"""
+    monkeypatch.setattr(settings, "price_dir", str(tmp_path))
+    return tmp_path
+
+
+def expire(ticker_file) -> None:
+    """Makes stored prices older than the refresh interval"""
+    stale = os.stat(ticker_file).st_mtime - settings.price_refresh_interval - 1
+    os.utime(ticker_file, (stale, stale))
+
+
+def test_price_frame_is_typed_and_sorted():
+    """Test daily bars are validated into a dated frame, oldest first"""
+    df = price_frame("aapl", load_fixture("historical-price-full")["historical"])
+
+    assert df.columns == [
+        "symbol",
+        "date",
+        "open",
+        "high",
+        "low",
+        "close",
+        "adj_close",
+        "volume",
+    ]
+    assert df["date"].dtype == pl.Date and df["date"].is_sorted()
+    assert df["symbol"][0] == "AAPL"
+    assert df["close"][-1] == 254.49
+
+
+def test_first_update_fetches_full_history(price_dir, fmp_calls):
+    """Test prices are fetched from the configured start and stored to Parquet"""
+    lf = asyncio.run(update_prices("AAPL"))
+
+    assert lf.collect().height == 10
+    assert (price_dir / "AAPL.parquet").exists()
+    assert f"from={settings.price_history_start.isoformat()}" in fmp_calls[0]
+
+
+def test_fresh_prices_are_read_from_disk(price_dir, fmp_calls):
+    """Test prices written within the refresh interval aren't fetched again"""
+    asyncio.run(update_prices("AAPL"))
+    asyncio.run(update_prices("AAPL"))
+
+    assert len(fmp_calls) == 1
+
+
+def test_update_appends_bars_since_last_stored_day(price_dir, fmp_calls, monkeypatch):
+    """Test only the bars since the last stored day are fetched and appended"""
+    asyncio.run(update_prices("AAPL"))
+    expire(price_dir / "AAPL.parquet")
+    new_bar = {**load_fixture("historical-price-full")["historical"][0]}
+    new_bar.update(date="2024-12-23", close=255.27)
+    corrected = {
+        **load_fixture("historical-price-full")["historical"][0],
+        "close": 254.0,
+    }
+
+    def handler(request):
+        fmp_calls.append(str(request.url))
+        if request.url.params.get("from") == "2024-12-20":
+            return httpx.Response(
+                200, json={"symbol": "AAPL", "historical": [new_bar, corrected]}
+            )
+        return fmp_handler(request)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(utils, "get_http_client", lambda: client)
+    df = asyncio.run(update_prices("AAPL")).collect()
+
+    assert "from=2024-12-20" in fmp_calls[-1]
+    assert df.height == 11
+    assert df["date"][-1] == date(2024, 12, 23)
+    assert df["close"].tail(2).to_list() == [254.0, 255.27]
+
+
+def test_unknown_ticker_stores_nothing(price_dir):
+    """Test a ticker without prices writes no file"""
+    assert asyncio.run(update_prices("UNKNOWN")) is None
+    assert scan_prices("UNKNOWN") is None
+
+
+def test_append_replaces_overlapping_days(price_dir):
+    """Test appending keeps one bar per day, preferring the latest fetch"""
+    bars = load_fixture("historical-price-full")["historical"]
+    append_prices("AAPL", price_frame("AAPL", bars))
+    append_prices("AAPL", price_frame("AAPL", [{**bars[0], "close": 1.0}]))
+
+    df = scan_prices("AAPL").collect()
+    assert df.height == 10
+    assert df["close"][-1] == 1.0
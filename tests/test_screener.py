@@ -0,0 +1,110 @@
+import asyncio
+
+import polars as pl
+
+from config import settings
+from screener import (
+    INDEX_METRICS,
+    build_index,
+    index_row,
+    index_schema,
+    index_written_at,
+    refresh_index,
+    scan_index,
+    screen,
+    write_index,
+)
+from tests.conftest import load_fixture
+from utils import CallBudget, charged_to, get_response_cache
+
+
+def test_build_index_one_row_per_ticker(fmp_calls):
+    """Test the index holds one typed row per ticker with data"""
+    df = asyncio.run(build_index(["MSFT", "AAPL", "UNKNOWN"]))
+
+    assert df["symbol"].to_list() == ["AAPL", "MSFT"]
+    assert df.schema == pl.Schema(index_schema())
+    row = df.row(0, named=True)
+    assert row["rating_score"] == load_fixture("rating")[0]["ratingScore"]
+    assert row["fiscal_year_end"] == "2024-09-28"
+    assert row["price"] == 227.52
+
+
+def test_refresh_keeps_index_when_nothing_is_fetched(fmp_calls, monkeypatch, tmp_path):
+    """Test a refresh that fetches no ticker, e.g. out of budget, keeps the index"""
+    path = str(tmp_path / "screener.parquet")
+    write_index(pl.DataFrame([{"symbol": "AAPL"}], schema=index_schema()), path)
+    monkeypatch.setattr(settings, "screener_index_path", path)
+
+    assert asyncio.run(refresh_index(["UNKNOWN"])) is None
+    assert scan_index(path).collect()["symbol"].to_list() == ["AAPL"]
+
+
+def test_refresh_keeps_index_when_the_budget_runs_out(fmp_calls, monkeypatch, tmp_path):
+    """Test a rebuild that fetches fewer tickers than the index holds keeps it"""
+    path = str(tmp_path / "screener.parquet")
+    monkeypatch.setattr(settings, "screener_index_path", path)
+    tickers = ["AAPL", "MSFT", "NVDA"]
+    asyncio.run(refresh_index(tickers))
+    before = scan_index(path).collect()
+
+    async def refresh_within(budget: CallBudget):
+        with charged_to(budget):
+            return await refresh_index(tickers)
+
+    # Six calls cover the bulk profile and quote batches, and one ticker's other
+    # sections
+    get_response_cache().clear()
+    assert asyncio.run(refresh_within(CallBudget(0))) is None
+    assert asyncio.run(refresh_within(CallBudget(6))) is None
+    assert scan_index(path).collect().equals(before)
+    assert before["price"].null_count() == 0
+
+
+def test_index_row_skips_tickers_without_any_section():
+    """Test a ticker whose every request failed gets no row"""
+    assert index_row("AAPL", [None] * len(INDEX_METRICS)) is None
+
+
+def test_index_row_leaves_invalid_sections_null():
+    """Test a section failing validation only blanks its own columns"""
+    data = [
+        load_fixture("profile"),
+        [{"symbol": "AAPL"}],
+        load_fixture("quote"),
+        load_fixture("key-metrics-ttm"),
+        load_fixture("financial-growth"),
+    ]
+    row = index_row("AAPL", data)
+
+    assert row["rating"] is None
+    assert row["company_name"] == "Apple Inc."
+
+
+def test_write_and_scan_index(tmp_path):
+    """Test the index round-trips through Parquet"""
+    path = str(tmp_path / "screener.parquet")
+    assert scan_index(path) is None and index_written_at(path) is None
+
+    df = pl.DataFrame({"symbol": ["AAPL"], "pe": [37.3]})
+    write_index(df, path)
+
+    assert scan_index(path).collect().equals(df)
+    assert index_written_at(path) is not None
+
+
+def test_screen_filters_and_sorts():
+    """Test range and sector filters, then a nulls-last sort"""
+    index = pl.DataFrame(
+        {
+            "symbol": ["A", "B", "C", "D"],
+            "sector": ["Tech", "Tech", "Energy", "Tech"],
+            "pe": [10.0, 30.0, 12.0, None],
+            "market_cap": [1.0, 3.0, 2.0, 4.0],
+        }
+    )
+
+    result = screen(index, {"pe": (None, 20.0)}, ["Tech"])
+    assert result["symbol"].to_list() == ["A"]
+    result = screen(index, sort_by="pe", descending=False)
+    assert result["symbol"].to_list() == ["A", "C", "B", "D"]
@@ -1,9 +1,25 @@
+import pickle
+import tracemalloc
+from dataclasses import FrozenInstanceError
+from typing import Any, ClassVar
+
+import polars as pl
+import pytest
+from pydantic import TypeAdapter, ValidationError
+
 from src.stock_models import (
+    CompanyProfile,
+    FrameValidationError,
     Growth,
+    KeyMetrics,
     KeyMetricsTTM,
     Quote,
+    QuoteRecord,
     Ratings,
+    frame_from_records,
+    record_type,
 )
+from tests.conftest import load_fixture
 
 
 class TestQuote:
@@ -171,3 +187,129 @@ class TestGrowth:
         assert growth.rev_growth is None
         assert growth.fcf_growth == 0.07
         assert growth.fiveY_rev_growth_per_share == 0.15
+
+
+class TestFrameFromRecords:
+    record: ClassVar[dict[str, Any]] = {
+        "symbol": "AAPL",
+        "date": "2024-09-28",
+        "revenuePerShare": 25.48,
+        "freeCashFlowPerShare": 7.09,
+        "peRatio": 37.29,
+        "enterpriseValueOverEBITDA": 26.74,
+        "evToFreeCashFlow": 32.45,
+        "freeCashFlowYield": 0.03,
+    }
+
+    def test_aliases_are_renamed_to_fields(self):
+        """Test FMP aliases become typed columns named after the model fields"""
+        df = frame_from_records(
+            KeyMetrics, [self.record, {**self.record, "peRatio": 30}]
+        )
+        assert df.columns == list(KeyMetrics.model_fields)
+        assert df.schema["pe_ratio"] == pl.Float64
+        assert df["pe_ratio"].to_list() == [37.29, 30.0]
+
+    def test_field_names_are_accepted(self):
+        """Test dumped records keyed by field name validate as well"""
+        dumped = KeyMetrics(**self.record).model_dump()
+        df = frame_from_records(KeyMetrics, [dumped])
+        assert df.row(0, named=True) == dumped
+
+    def test_null_values_of_nullable_fields_are_kept(self):
+        """Test a null in a nullable column is read as null"""
+        df = frame_from_records(
+            KeyMetrics, [self.record, {**self.record, "peRatio": None}]
+        )
+        assert df["pe_ratio"].null_count() == 1
+
+    def test_missing_required_key_is_rejected(self):
+        """Test a missing key fails validation, even for a nullable field"""
+        record = {k: v for k, v in self.record.items() if k != "peRatio"}
+        with pytest.raises(FrameValidationError, match="pe_ratio"):
+            frame_from_records(KeyMetrics, [self.record, record])
+        with pytest.raises(ValidationError):
+            KeyMetrics(**record)
+
+    def test_mixed_and_nested_values_are_rejected(self):
+        """Test values the model rejects don't slip through as other dtypes"""
+        cases = [
+            [{**self.record, "peRatio": [1]}, {**self.record, "symbol": {"a": 1}}],
+            [{**self.record, "peRatio": {"x": 1.0}}],
+            [self.record, {**self.record, "symbol": 5}],
+            [{**self.record, "peRatio": True}],
+        ]
+        for records in cases:
+            with pytest.raises(FrameValidationError):
+                frame_from_records(KeyMetrics, records)
+
+    def test_required_null_is_rejected(self):
+        """Test a null in a required column fails validation"""
+        with pytest.raises(FrameValidationError, match="date"):
+            frame_from_records(KeyMetrics, [{**self.record, "date": None}])
+
+    def test_wrong_type_is_rejected(self):
+        """Test a value that can't be cast to the field type fails validation"""
+        with pytest.raises(FrameValidationError, match="pe_ratio"):
+            frame_from_records(KeyMetrics, [{**self.record, "peRatio": "n/a"}])
+        with pytest.raises(FrameValidationError, match="symbol"):
+            frame_from_records(KeyMetrics, [{**self.record, "symbol": 1}])
+
+    def test_empty_records_keep_the_schema(self):
+        """Test empty input gives an empty frame with the model's columns"""
+        df = frame_from_records(Growth, [])
+        assert df.is_empty()
+        assert df.columns == list(Growth.model_fields)
+        with pytest.raises(FrameValidationError):
+            frame_from_records(Growth, None)
+
+
+class TestRecords:
+    # Single-record sections and their recorded FMP responses
+    SECTIONS: ClassVar[list[tuple[type, str]]] = [
+        (CompanyProfile, "profile"),
+        (Quote, "quote"),
+        (Ratings, "rating"),
+        (KeyMetricsTTM, "key-metrics-ttm"),
+    ]
+
+    def test_record_copies_model_fields(self):
+        """Test a record holds the validated values under the model's field names"""
+        quote = Quote.model_validate(load_fixture("quote")[0])
+        record = QuoteRecord(**dict(quote))
+
+        assert record.price == quote.price
+        assert record.earning_date == quote.earning_date
+
+    def test_record_is_immutable_and_slotted(self):
+        """Test records can't be changed and have no per-instance dict"""
+        record = QuoteRecord(**dict(Quote.model_validate(load_fixture("quote")[0])))
+
+        with pytest.raises(FrozenInstanceError):
+            record.price = 1.0
+        assert not hasattr(record, "__dict__")
+        assert pickle.loads(pickle.dumps(record)) == record
+
+    def test_records_take_less_memory_than_dumps(self):
+        """Test a ticker's records take well under half the memory of model dumps"""
+        models = [
+            (
+                record_type(model),
+                TypeAdapter(list[model]).validate_python(load_fixture(metric)),
+            )
+            for model, metric in self.SECTIONS
+        ]
+
+        def footprint(build) -> int:
+            tracemalloc.start()
+            kept = [build() for _ in range(100)]
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            assert len(kept) == 100
+            return size // 100
+
+        dumps = footprint(lambda: [[m.model_dump() for m in ms] for _, ms in models])
+        records = footprint(
+            lambda: [[record(**dict(m)) for m in ms] for record, ms in models]
+        )
+        assert records < dumps * 0.6
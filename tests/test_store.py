@@ -0,0 +1,75 @@
+from datetime import date
+
+import polars as pl
+
+from store import SnapshotStore, write_parquet_atomic
+
+
+class TestSnapshotStore:
+    def test_save_and_load(self, tmp_path):
+        """Test saved sections round-trip per ticker"""
+        store = SnapshotStore(path=str(tmp_path / "snapshots.db"))
+        store.save("aapl", {"quote": [{"symbol": "AAPL", "price": 1.0}]})
+
+        assert store.load("AAPL") == {"quote": [{"symbol": "AAPL", "price": 1.0}]}
+        assert store.load("MSFT") is None
+        store.close()
+
+    def test_latest_section_per_fetch_date(self, tmp_path):
+        """Test the newest fetch of each section is returned"""
+        store = SnapshotStore(path=str(tmp_path / "snapshots.db"))
+        store.save("AAPL", {"quote": [{"price": 1.0}]}, date(2024, 1, 1))
+        store.save("AAPL", {"profile": [{"beta": 1.2}]}, date(2024, 1, 1))
+        store.save("AAPL", {"quote": [{"price": 2.0}]}, date(2024, 1, 2))
+
+        assert store.fetch_dates("AAPL") == ["2024-01-02", "2024-01-01"]
+        assert store.load("AAPL") == {
+            "quote": [{"price": 2.0}],
+            "profile": [{"beta": 1.2}],
+        }
+        assert store.load("AAPL", date(2024, 1, 1))["quote"] == [{"price": 1.0}]
+        store.close()
+
+    def test_load_universe_returns_latest_per_ticker(self, tmp_path):
+        """Test one section is read for every stored ticker, newest fetch first"""
+        store = SnapshotStore(path=str(tmp_path / "snapshots.db"))
+        store.save("AAPL", {"quote": [{"price": 1.0}]}, date(2024, 1, 1))
+        store.save("AAPL", {"quote": [{"price": 2.0}]}, date(2024, 1, 2))
+        store.save("MSFT", {"quote": [{"price": 3.0}], "profile": [{"beta": 0.9}]})
+
+        assert store.load_universe("quote") == {
+            "AAPL": [{"price": 2.0}],
+            "MSFT": [{"price": 3.0}],
+        }
+        assert store.load_universe("growth") == {}
+        store.close()
+
+    def test_load_section_reads_one_section(self, tmp_path):
+        """Test only the newest fetch of the requested section is read"""
+        store = SnapshotStore(path=str(tmp_path / "snapshots.db"))
+        store.save("AAPL", {"quote": [{"price": 1.0}]}, date(2024, 1, 1))
+        store.save("AAPL", {"quote": [{"price": 2.0}], "profile": [{"beta": 1.2}]})
+
+        fetched_at, records = store.load_section("aapl", "quote")
+        assert records == [{"price": 2.0}] and fetched_at > 0
+        assert store.load_section("AAPL", "growth") is None
+        store.close()
+
+    def test_connection_is_lazy(self, tmp_path):
+        """Test nothing is opened until the first read or write"""
+        path = tmp_path / "nested" / "snapshots.db"
+        store = SnapshotStore(path=str(path))
+        assert not path.exists()
+        store.fetch_dates("AAPL")
+        assert path.exists()
+        store.close()
+
+
+def test_write_parquet_atomic_replaces_the_file(tmp_path):
+    """Test a frame replaces the previous file without leaving a partial one"""
+    path = tmp_path / "nested" / "frame.parquet"
+    write_parquet_atomic(pl.DataFrame({"v": [1]}), path)
+    write_parquet_atomic(pl.DataFrame({"v": [2]}), path)
+
+    assert pl.read_parquet(path)["v"].to_list() == [2]
+    assert [p.name for p in path.parent.iterdir()] == ["frame.parquet"]
@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+
+import polars as pl
+
+from transforms import as_percent, downsample, growth_history, metrics_history
+
+
+def growth_rows(symbol: str, *rows: tuple[str, float | None]) -> list[dict]:
+    return [
+        {"symbol": symbol, "date": date, "rev_growth": value} for date, value in rows
+    ]
+
+
+def test_growth_history_converts_to_percent_and_keeps_nulls():
+    """Test growth rates become rounded percentages without failing on nulls"""
+    df = growth_history(
+        pl.DataFrame(growth_rows("AAPL", ("2024-09-28", 0.02022), ("2023-09-30", None)))
+    )
+
+    assert df.columns == ["symbol", "rev_growth", "Year"]
+    assert df["rev_growth"].to_list() == [None, 2.02]
+    assert df["Year"].dtype == pl.Date
+
+
+def test_histories_sort_each_ticker_in_lazy_mode():
+    """Test the pipeline runs lazily over a multi-ticker frame"""
+    rows = growth_rows("MSFT", ("2024-06-30", 0.1), ("2023-06-30", 0.2))
+    rows += growth_rows("AAPL", ("2024-09-28", 0.3), ("2023-09-30", 0.4))
+    lf = metrics_history(pl.LazyFrame(rows))
+
+    assert isinstance(lf, pl.LazyFrame)
+    df = lf.collect()
+    assert df["symbol"].to_list() == ["AAPL", "AAPL", "MSFT", "MSFT"]
+    assert df["rev_growth"].to_list() == [0.4, 0.3, 0.2, 0.1]
+
+
+def test_as_percent_limits_to_columns():
+    """Test only the named columns are converted"""
+    df = pl.DataFrame({"a": [0.12346], "b": [0.5]}).with_columns(as_percent(["a"]))
+
+    assert df.row(0) == (12.35, 0.5)
+
+
+def test_downsample_keeps_extremes_and_ends():
+    """Test min/max bucketing bounds the size but keeps peaks, troughs and ends"""
+    closes = [float((i * 37) % 101) for i in range(10_000)]
+    dates = [date(1990, 1, 1) + timedelta(days=i) for i in range(10_000)]
+    df = pl.DataFrame({"date": dates, "close": closes}).reverse()
+
+    sampled = downsample(df.lazy(), 500).collect()
+
+    assert sampled.height <= 502
+    assert sampled["date"].is_sorted()
+    assert sampled["date"][0] == dates[0] and sampled["date"][-1] == dates[-1]
+    assert sampled["close"].max() == 100.0 and sampled["close"].min() == 0.0
+
+
+def test_downsample_keeps_short_series():
+    """Test a series shorter than the point budget is kept whole"""
+    df = pl.DataFrame(
+        {"date": [date(2024, 1, d) for d in (1, 2, 3)], "close": [3.0, 1.0, 2.0]}
+    )
+
+    assert downsample(df, 1_000).equals(df)
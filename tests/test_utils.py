@@ -1,5 +1,22 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import utils
+from cache import TTLCache
 from config import settings
-from utils import FMPClient
+from utils import (
+    CircuitBreaker,
+    FMPClient,
+    RateLimiter,
+    close_http_client,
+    get_http_client,
+    get_response_cache,
+    retry_delay,
+    run_sync,
+)
 
 
 def test_fmp_client_initialization():
@@ -9,3 +26,233 @@ def test_fmp_client_initialization():
     assert len(client.metric_types) == 6
     assert "profile" in client.metric_types
     assert "rating" in client.metric_types
+
+
+def test_shared_http_client_is_reused():
+    async def get_clients():
+        return get_http_client(), get_http_client()
+
+    first, second = run_sync(get_clients())
+    assert first is second
+    assert not first.is_closed
+    assert run_sync(get_clients())[0] is first
+
+
+def test_close_http_client():
+    async def close_and_reopen():
+        client = get_http_client()
+        await close_http_client()
+        return client, get_http_client()
+
+    closed, reopened = run_sync(close_and_reopen())
+    assert closed.is_closed
+    assert reopened is not closed
+
+
+def test_get_metric_serves_cached_responses():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(200, json=[{"symbol": "AAPL", "price": 1.0}])
+
+    async def fetch_twice():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            fmp = FMPClient(http_client=client)
+            first = await fmp.get_metric(client, "quote", "AAPL")
+            second = await fmp.get_metric(client, "quote", "aapl")
+            return first, second
+
+    get_response_cache().clear()
+    first, second = run_sync(fetch_twice())
+    assert first == second
+    assert len(calls) == 1
+    assert get_response_cache().stats()["hits"] == 1
+    get_response_cache().clear()
+
+
+def test_rate_limiter_spaces_calls_beyond_burst():
+    limiter = RateLimiter(calls_per_minute=6_000, burst=2)
+
+    async def acquire_many():
+        start = time.monotonic()
+        for _ in range(5):
+            await limiter.acquire()
+        return time.monotonic() - start
+
+    # Two calls pass immediately, the other three wait 10ms each
+    assert run_sync(acquire_many()) >= 0.025
+
+
+def test_fetch_many_bounds_concurrency(monkeypatch):
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json=[{"symbol": request.url.path.split("/")[-1]}])
+
+    async def fetch_all(tickers):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            fmp = FMPClient(http_client=client, metric_types=["rating"])
+            return [item async for item in fmp.fetch_many(tickers, concurrency=3)]
+
+    limiter = RateLimiter(60_000, burst=100)
+    monkeypatch.setattr(utils, "get_rate_limiter", lambda: limiter)
+    get_response_cache().clear()
+    tickers = [f"T{i}" for i in range(10)]
+    results = run_sync(fetch_all(tickers + ["T0"]))
+
+    assert sorted(ticker for ticker, _ in results) == sorted(tickers)
+    assert all(data == [[{"symbol": ticker}]] for ticker, data in results)
+    assert peak <= 3
+    get_response_cache().clear()
+
+
+def test_fetch_many_batches_bulk_endpoints(monkeypatch):
+    paths = []
+
+    def handler(request):
+        paths.append(request.url.path)
+        symbols = request.url.path.split("/")[-1].split(",")
+        return httpx.Response(200, json=[{"symbol": symbol} for symbol in symbols])
+
+    async def fetch_all(tickers):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            fmp = FMPClient(http_client=client, metric_types=["profile", "quote"])
+            return dict([item async for item in fmp.fetch_many(tickers)])
+
+    limiter = RateLimiter(60_000, burst=100)
+    monkeypatch.setattr(utils, "get_rate_limiter", lambda: limiter)
+    monkeypatch.setattr(settings, "bulk_chunk_size", 2)
+    get_response_cache().clear()
+    results = run_sync(fetch_all(["AAPL", "MSFT", "NVDA"]))
+
+    # Two chunks per endpoint, no single-symbol requests
+    assert len(paths) == 4
+    assert results["MSFT"] == [[{"symbol": "MSFT"}], [{"symbol": "MSFT"}]]
+    get_response_cache().clear()
+
+
+def test_fetch_many_uses_bulk_rows_beyond_the_cache_size(monkeypatch):
+    paths = []
+
+    def handler(request):
+        paths.append(request.url.path)
+        symbols = request.url.path.split("/")[-1].split(",")
+        return httpx.Response(200, json=[{"symbol": symbol} for symbol in symbols])
+
+    async def fetch_all(tickers):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            fmp = FMPClient(http_client=client, metric_types=["profile", "quote"])
+            return dict([item async for item in fmp.fetch_many(tickers)])
+
+    limiter = RateLimiter(60_000, burst=100)
+    cache = TTLCache(max_entries=4)
+    monkeypatch.setattr(utils, "get_rate_limiter", lambda: limiter)
+    monkeypatch.setattr(utils, "get_response_cache", lambda: cache)
+    tickers = [f"T{i}" for i in range(20)]
+    results = run_sync(fetch_all(tickers))
+
+    # One bulk request per endpoint, even though most rows were evicted
+    assert len(paths) == 2
+    assert cache.evictions > 0
+    assert results["T0"] == [[{"symbol": "T0"}], [{"symbol": "T0"}]]
+
+
+def test_run_sync_rejects_the_background_loop():
+    async def nested():
+        with pytest.raises(RuntimeError):
+            run_sync(asyncio.sleep(0))
+
+    run_sync(nested())
+
+
+def test_get_data_retries_transient_errors(monkeypatch):
+    responses = iter([httpx.Response(503), httpx.Response(429), None])
+
+    def handler(request):
+        return next(responses) or httpx.Response(200, json=[{"symbol": "AAPL"}])
+
+    async def get():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await FMPClient(http_client=client).get_data(client, "https://x/q")
+
+    monkeypatch.setattr(settings, "retry_backoff_base", 0.001)
+    assert run_sync(get()) == [{"symbol": "AAPL"}]
+
+
+def test_retry_delay_honors_retry_after():
+    assert retry_delay(0, "3") == 3.0
+    assert retry_delay(0, "Thu, 01 Jan 1970 00:00:00 GMT") == 0.0
+    assert 0 < retry_delay(10) <= settings.retry_backoff_max
+
+
+def test_circuit_breaker_fails_fast_then_probes():
+    clock = [0.0]
+    breaker = CircuitBreaker(
+        failure_threshold=2, reset_timeout=30, clock=lambda: clock[0]
+    )
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    # One probe after the cool-down, then closed again on success
+    clock[0] = 31
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_get_metric_serves_stale_data_when_upstream_fails(monkeypatch):
+    async def get():
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(503))
+        ) as client:
+            return await FMPClient(http_client=client).get_metric(
+                client, "quote", "AAPL"
+            )
+
+    monkeypatch.setattr(settings, "retry_attempts", 0)
+    get_response_cache().clear()
+    get_response_cache().set(
+        utils.cache_key("quote", "AAPL"), [{"price": 1.0}], ttl=0.001
+    )
+    time.sleep(0.01)
+
+    assert run_sync(get()) == [{"price": 1.0}]
+    get_response_cache().clear()
+
+
+def test_rate_limit_queueing_does_not_count_against_the_deadline(monkeypatch):
+    """Test requests waiting for a token neither time out nor trip the breaker"""
+    calls = []
+
+    def handler(request):
+        calls.append(request.url)
+        return httpx.Response(200, json=[{"symbol": "AAPL"}])
+
+    async def get_all():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            fmp = FMPClient(http_client=client)
+            return await asyncio.gather(
+                *(fmp.get_data(client, f"https://x/q/{i}") for i in range(12))
+            )
+
+    breaker = CircuitBreaker(failure_threshold=2)
+    monkeypatch.setattr(utils, "get_circuit_breaker", lambda: breaker)
+    limiter = RateLimiter(1_200, burst=1)
+    monkeypatch.setattr(utils, "get_rate_limiter", lambda: limiter)
+    monkeypatch.setattr(settings, "request_deadline", 0.2)
+
+    # Twelve calls at 20 per second queue for over half a second in total
+    assert all(run_sync(get_all()))
+    assert len(calls) == 12
+    assert breaker.state == "closed"
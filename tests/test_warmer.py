@@ -0,0 +1,171 @@
+import asyncio
+from datetime import date, datetime, time
+from zoneinfo import ZoneInfo
+
+import httpx
+import pytest
+
+import utils
+from config import settings
+from utils import FMPClient, cache_key, get_response_cache
+from warmer import CALLS_PER_TICKER, CallBudget, Warmer
+
+NEW_YORK = ZoneInfo("America/New_York")
+
+# Upstream that is down for every request
+FAILING = httpx.MockTransport(lambda request: httpx.Response(503))
+
+# A Monday and a Saturday in market time
+MONDAY = date(2025, 3, 3)
+SATURDAY = date(2025, 3, 8)
+
+
+def at(day: date, hour: int, minute: int = 0) -> datetime:
+    return datetime.combine(day, time(hour, minute), NEW_YORK)
+
+
+@pytest.fixture
+def warmer():
+    """Gives a warmer that has already run its start-up warm"""
+    return Warmer(
+        tickers=["AAPL", "MSFT"], budget=CallBudget(1_000), warmed_on=date(2025, 3, 2)
+    )
+
+
+def test_budget_resets_daily():
+    """Test spending is capped per day and starts over the next day"""
+    today = [MONDAY]
+    budget = CallBudget(10, clock=lambda: today[0])
+
+    assert budget.try_spend(8)
+    assert not budget.try_spend(3)
+    today[0] = date(2025, 3, 4)
+    assert budget.try_spend(10)
+
+
+def test_quotes_are_polled_within_their_cache_ttl():
+    """Test the default poll interval keeps polled quotes from expiring"""
+    assert settings.warm_quote_interval < settings.cache_ttls["quote"]
+
+
+def test_warms_on_first_run():
+    """Test a fresh warmer warms right away, even on a weekend"""
+    warmer = Warmer(tickers=["AAPL"], budget=CallBudget(100))
+
+    assert warmer.due(at(SATURDAY, 12)) == ["warm"]
+
+
+@pytest.mark.parametrize(
+    "now, jobs",
+    [
+        (at(MONDAY, 1), []),
+        (at(MONDAY, 3), ["annual"]),
+        (at(MONDAY, 9, 5), ["warm"]),
+        (at(MONDAY, 10), ["warm", "quotes"]),
+        (at(MONDAY, 17), ["warm"]),
+        (at(SATURDAY, 10), []),
+        (at(SATURDAY, 3), ["annual"]),
+    ],
+)
+def test_due_follows_market_hours(warmer, now, jobs):
+    """Test annual refresh overnight, warming before the open and quotes while open"""
+    assert warmer.due(now) == jobs
+
+
+def test_due_respects_intervals(warmer):
+    """Test jobs already run are not due again until their next slot"""
+    now = at(MONDAY, 10)
+    warmer.warmed_on = warmer.annual_refreshed_on = MONDAY
+    warmer.quotes_polled_at = now
+
+    assert warmer.due(now) == []
+    assert warmer.due(at(MONDAY, 10, 1)) == ["quotes"]
+
+
+def test_run_due_warms_watchlist(fmp_calls):
+    """Test a warm fetches every section, with bulk requests for profile and quote"""
+    warmer = Warmer(
+        tickers=["AAPL", "MSFT"], budget=CallBudget(100), clock=lambda: at(MONDAY, 9)
+    )
+
+    assert asyncio.run(warmer.run_due()) == ["warm"]
+    assert len(fmp_calls) == 2 + 2 * CALLS_PER_TICKER
+    assert get_response_cache().get(cache_key("rating", "MSFT")) is not None
+    assert warmer.budget.spent == len(fmp_calls)
+
+
+def test_warm_stays_within_budget(fmp_calls):
+    """Test a budget too small for the watchlist warms only the leading tickers"""
+    warmer = Warmer(tickers=["AAPL", "MSFT"], budget=CallBudget(2 + CALLS_PER_TICKER))
+
+    asyncio.run(warmer.warm_all())
+
+    assert not any("MSFT" in url for url in fmp_calls)
+    assert get_response_cache().get(cache_key("rating", "AAPL")) is not None
+
+
+def test_poll_quotes_uses_bulk_request(fmp_calls, monkeypatch):
+    """Test quotes are re-polled in one request per chunk, past the cache TTL"""
+    monkeypatch.setattr(settings, "bulk_chunk_size", 2)
+    warmer = Warmer(tickers=["AAPL", "MSFT", "NVDA"], budget=CallBudget(100))
+    get_response_cache().set(
+        cache_key("quote", "AAPL"), [{"symbol": "AAPL"}], ttl=3_600
+    )
+
+    asyncio.run(warmer.poll_quotes())
+
+    assert len(fmp_calls) == 2
+    assert all("/quote/" in url for url in fmp_calls)
+    assert warmer.budget.spent == 2
+    assert get_response_cache().get(cache_key("quote", "AAPL"))[0]["price"] == 227.52
+
+
+def test_refresh_annual_bypasses_cache(fmp_calls):
+    """Test the overnight refresh re-fetches annual histories already cached"""
+    client = FMPClient()
+    warmer = Warmer(tickers=["AAPL"], budget=CallBudget(100), client=client)
+    asyncio.run(client.fetch_data("AAPL", ["key-metrics", "financial-growth"]))
+    fmp_calls.clear()
+
+    asyncio.run(warmer.refresh_annual())
+
+    assert len(fmp_calls) == 2
+    assert warmer.budget.spent == 2
+
+
+def test_failed_poll_keeps_cached_quotes(fmp_calls, monkeypatch):
+    """Test a poll that fails upstream leaves the last quotes in the cache"""
+    monkeypatch.setattr(settings, "retry_attempts", 0)
+    monkeypatch.setattr(
+        utils, "get_http_client", lambda: httpx.AsyncClient(transport=FAILING)
+    )
+    warmer = Warmer(tickers=["AAPL"], budget=CallBudget(100))
+    get_response_cache().set(cache_key("quote", "AAPL"), [{"price": 1.0}], ttl=3_600)
+
+    asyncio.run(warmer.poll_quotes())
+
+    assert get_response_cache().get(cache_key("quote", "AAPL")) == [{"price": 1.0}]
+
+
+def test_sidecar_stores_polled_quotes(fmp_calls, snapshot_store):
+    """Test a sidecar writes polled quotes to the shared snapshot store"""
+    warmer = Warmer(tickers=["AAPL", "MSFT"], budget=CallBudget(100), store_quotes=True)
+
+    asyncio.run(warmer.poll_quotes())
+
+    [(_, quote)] = snapshot_store.load_sections("MSFT").values()
+    assert quote[0]["symbol"] == "MSFT"
+
+
+def test_budget_counts_retries_and_stops_requests(fmp_calls, monkeypatch):
+    """Test every upstream attempt is charged and none go out past the budget"""
+    monkeypatch.setattr(settings, "retry_backoff_base", 0.001)
+    monkeypatch.setattr(
+        utils, "get_http_client", lambda: httpx.AsyncClient(transport=FAILING)
+    )
+    warmer = Warmer(tickers=["AAPL"], budget=CallBudget(2))
+
+    asyncio.run(warmer.poll_quotes())
+
+    assert warmer.budget.spent == 2
+    assert warmer.budget.remaining() == 0